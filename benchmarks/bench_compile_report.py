@@ -0,0 +1,63 @@
+import argparse
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src" / "training_log_generator"))
+
+from report import ReportGenerator
+
+
+def synthetic_frame(rows: int, seed: int = 0) -> pd.DataFrame:
+    # same shape as the frame returned by DataLoader.load_data, newest run first
+    rng = np.random.default_rng(seed)
+    day_offsets = np.sort(rng.integers(0, max(rows // 2, 1), size=rows))[::-1]
+    first_day = date(2000, 1, 1)
+    unique_offsets = np.unique(day_offsets)
+    days = dict(zip(unique_offsets.tolist(), [first_day + timedelta(days=int(d)) for d in unique_offsets]))
+    distance = rng.uniform(2, 20, size=rows).round(2)
+    pace = rng.integers(240, 360, size=rows)
+    seconds = (distance * pace).astype(int)
+    return pd.DataFrame({
+        "Date": [days[d] for d in day_offsets.tolist()],
+        "Distance": distance,
+        "Time": [f"{s // 3600:02d}:{s % 3600 // 60:02d}:{s % 60:02d}" for s in seconds.tolist()],
+        "Avg Pace": [f"{p // 60}:{p % 60:02d}" for p in pace.tolist()],
+        "am_pm": np.where(rng.random(rows) < 0.6, "morning", "afternoon"),
+    })
+
+
+def time_compile(df: pd.DataFrame, vectorized: bool, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        ReportGenerator(df).compile_report(vectorized=vectorized)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ReportGenerator.compile_report")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000, 1_000_000])
+    parser.add_argument("--legacy-max", type=int, default=100_000, help="largest size to run the groupby path on")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'vectorized (s)':>15} {'ns/row':>8} {'groupby (s)':>12} {'speedup':>8}")
+    for rows in args.sizes:
+        df = synthetic_frame(rows)
+        fast = time_compile(df, True, args.repeat)
+        line = f"{rows:>10} {fast:>15.4f} {fast / rows * 1e9:>8.0f}"
+        if rows <= args.legacy_max:
+            slow = time_compile(df, False, 1)
+            assert ReportGenerator(df).compile_report(vectorized=False) == ReportGenerator(df).compile_report()
+            line += f" {slow:>12.4f} {slow / fast:>7.1f}x"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+import argparse
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src" / "training_log_generator"))
+
+from analytics import TrainingLoad
+from dataloader import DataLoader
+from engines import compile_report_stdlib, pyarrow_available, read_pyarrow
+from formats import RENDERERS
+from renderer import TemplateRenderer
+from report import ReportGenerator
+from rollup import Rollup
+from synthetic import write_export
+
+TEMPLATE_PATH = str(Path(__file__).resolve().parents[1] / "data" / "log_template.docx")
+LAST_DAY = "2025-03-16"
+DEFAULT_SIZES = [100, 10_000, 100_000, 1_000_000]
+
+
+def best_of(repeat: int, stage: Callable[[], object]) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        stage()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench_export(path: str, repeat: int) -> Dict[str, float]:
+    loader = DataLoader(path, LAST_DAY, 6)
+    renderer = TemplateRenderer(TEMPLATE_PATH)
+    renderer.load_package()
+    timings = {}
+
+    # every stage works on a fresh copy of the previous stage's output, so repeats do not see mutated frames
+    timings["csv_read"] = best_of(repeat, lambda: pd.read_csv(path))
+    raw = pd.read_csv(path)
+    timings["date_preprocessing"] = best_of(repeat, lambda: loader.parse_dates(raw.copy()))
+    parsed = loader.parse_dates(raw.copy())
+    timings["filter"] = best_of(repeat, lambda: loader.filter_by_date(parsed))
+    data = loader.filter_by_date(parsed)
+    timings["compile"] = best_of(repeat, lambda: ReportGenerator(data).compile_grid(LAST_DAY, 6))
+    report = ReportGenerator(data).compile_grid(LAST_DAY, 6)
+    timings["context"] = best_of(repeat, lambda: renderer.prepare_context(report))
+    context = renderer.prepare_context(report)
+    timings["docx_render"] = best_of(repeat, lambda: renderer.render_context(context))
+    doc = renderer.render_context(context)
+    timings["docx_save"] = best_of(repeat, lambda: renderer.save_document(doc, io.BytesIO()))
+    timings["total"] = sum(timings.values())
+
+    # alternative parse engines, outside the total
+    if pyarrow_available():
+        timings["csv_read_pyarrow"] = best_of(repeat, lambda: read_pyarrow(path))
+    timings["stdlib_report"] = best_of(repeat, lambda: compile_report_stdlib(path, LAST_DAY, 6))
+    compiled_template = renderer.load_compiled_template()
+    if compiled_template is not None:
+        timings["compiled_render"] = best_of(repeat, lambda: renderer.load_package().write(io.BytesIO(), compiled_template.render(context)))
+    for output_format, renderer_class in RENDERERS.items():
+        timings[f"{output_format}_render"] = best_of(repeat, lambda: renderer_class().render(context))
+
+    # history dashboards: the rollup is built once over the whole export, then queried per range
+    timings["rollup_build"] = best_of(repeat, lambda: Rollup.from_frame(parsed))
+    rollup = Rollup.from_frame(parsed)
+    timings["rollup_range"] = best_of(repeat, lambda: rollup.totals(rollup.first_day, rollup.last_day))
+    timings["rollup_weekly"] = best_of(repeat, rollup.weekly)
+    timings["training_load"] = best_of(repeat, lambda: TrainingLoad.from_frame(parsed).weekly())
+    return timings
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Time each stage of the report pipeline on synthetic exports")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--locales", nargs="+", choices=["en", "pt"], default=["en", "pt"])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", default="bench_results.json", help="machine-readable results, see compare.py")
+    args = parser.parse_args(argv)
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for locale in args.locales:
+            for rows in args.sizes:
+                path = write_export(os.path.join(directory, f"export_{locale}_{rows}.csv"), rows, locale, LAST_DAY)
+                for stage, seconds in bench_export(path, args.repeat).items():
+                    results.append({"locale": locale, "rows": rows, "stage": stage, "seconds": seconds})
+                    print(f"{locale} {rows:>9} {stage:<20} {seconds * 1000:>10.2f} ms")
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "machine": platform.machine(),
+            "repeat": args.repeat,
+            "results": results,
+        }, f, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
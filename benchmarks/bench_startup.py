@@ -0,0 +1,56 @@
+import argparse
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+SOURCE_DIR = Path(__file__).resolve().parents[1] / "src" / "training_log_generator"
+HEAVY_MODULES = ["pandas", "numpy", "docxtpl", "docx"]
+
+# fails (exit 1) when the headless CLI gets slow to start, e.g. after a heavy import sneaks in at module level
+CHECK_IMPORTS = (
+    "import sys, generate\n"
+    f"loaded = [name for name in {HEAVY_MODULES!r} if name in sys.modules]\n"
+    "print(','.join(loaded))\n"
+)
+
+
+def time_command(command: List[str], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=SOURCE_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Check the startup time of the headless CLI")
+    parser.add_argument("--budget-ms", type=float, default=150.0, help="allowed time for --help on top of a bare interpreter")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    loaded = subprocess.run([sys.executable, "-c", CHECK_IMPORTS], cwd=SOURCE_DIR, capture_output=True, text=True, check=True).stdout.strip()
+    interpreter = time_command([sys.executable, "-c", "pass"], args.repeat)
+    help_time = time_command([sys.executable, "generate.py", "--help"], args.repeat)
+    invalid_time = time_command([sys.executable, "generate.py", "export.csv", "--start-day", "yesterday"], args.repeat)
+
+    overhead = max(help_time, invalid_time) - interpreter
+    print(f"interpreter   {interpreter * 1000:8.1f} ms")
+    print(f"--help        {help_time * 1000:8.1f} ms")
+    print(f"invalid args  {invalid_time * 1000:8.1f} ms")
+    print(f"overhead      {overhead * 1000:8.1f} ms (budget {args.budget_ms:.0f} ms)")
+
+    failed = False
+    if loaded:
+        print(f"FAIL: importing generate loads {loaded}")
+        failed = True
+    if overhead * 1000 > args.budget_ms:
+        print("FAIL: startup over budget")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
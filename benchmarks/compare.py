@@ -0,0 +1,28 @@
+import argparse
+import json
+
+
+def load(path: str):
+    with open(path, encoding="utf-8") as f:
+        return {(r["locale"], r["rows"], r["stage"]): r["seconds"] for r in json.load(f)["results"]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two bench_stages.py result files side by side")
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    args = parser.parse_args()
+
+    baseline, candidate = load(args.baseline), load(args.candidate)
+    print(f"{'locale':<6} {'rows':>9} {'stage':<20} {'baseline ms':>12} {'candidate ms':>13} {'speedup':>8}")
+    for key in sorted(baseline.keys() & candidate.keys()):
+        locale, rows, stage = key
+        before, after = baseline[key], candidate[key]
+        speedup = f"{before / after:.2f}x" if after else "-"
+        print(f"{locale:<6} {rows:>9} {stage:<20} {before * 1000:>12.2f} {after * 1000:>13.2f} {speedup:>8}")
+    for key in sorted(baseline.keys() ^ candidate.keys()):
+        print(f"only in {'baseline' if key in baseline else 'candidate'}: {key}")
+
+
+if __name__ == "__main__":
+    main()
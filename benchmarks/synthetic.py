@@ -0,0 +1,115 @@
+import argparse
+from datetime import datetime
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+# a realistic subset of the 30+ columns of a Garmin Connect activities export
+COLUMNS: Dict[str, List[str]] = {
+    "en": [
+        "Activity Type", "Date", "Favorite", "Title", "Distance", "Calories", "Time", "Avg HR", "Max HR",
+        "Aerobic TE", "Avg Run Cadence", "Max Run Cadence", "Avg Pace", "Best Pace", "Total Ascent",
+        "Total Descent", "Avg Stride Length", "Min Temp", "Max Temp", "Moving Time", "Elapsed Time",
+        "Min Elevation", "Max Elevation",
+    ],
+    "pt": [
+        "Tipo de atividade", "Data", "Favorito", "Título", "Distância", "Calorias", "Tempo", "FC Média",
+        "FC máxima", "TE aeróbico", "Cadência de corrida média", "Cadência de corrida máxima", "Ritmo médio",
+        "Melhor ritmo", "Subida total", "Descida total", "Comprimento médio da passada", "Temp. mín.",
+        "Temp. máx.", "Tempo em movimento", "Tempo decorrido", "Elevação mínima", "Elevação máxima",
+    ],
+}
+
+# runs per half day: mostly one, sometimes a warm up / workout / cool down split
+RUNS_PER_HALF_DAY = [0, 1, 1, 1, 1, 2, 3]
+# about 19k rows fill this; bigger exports wrap around and stack more runs on the same days,
+# so the dates stay well inside what datetime64[ns] holds (back to 1677)
+HISTORY_DAYS = 20 * 365
+
+
+def _clock(seconds: np.ndarray) -> pd.Series:
+    seconds = pd.Series(seconds)
+    return (
+        (seconds // 3600).astype(str).str.zfill(2) + ":"
+        + (seconds % 3600 // 60).astype(str).str.zfill(2) + ":"
+        + (seconds % 60).astype(str).str.zfill(2)
+    )
+
+
+def _pace(seconds: np.ndarray) -> pd.Series:
+    seconds = pd.Series(seconds)
+    return (seconds // 60).astype(str) + ":" + (seconds % 60).astype(str).str.zfill(2)
+
+
+def synthetic_export(rows: int, locale: str = "en", last_day: str = "2025-03-16", seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+
+    # enough half days to hold the requested rows, each with 0-3 runs
+    runs = rng.choice(RUNS_PER_HALF_DAY, size=rows)
+    runs = runs[: np.searchsorted(np.cumsum(runs), rows) + 1]
+    half_day = np.repeat(np.arange(runs.size), runs)[:rows]
+    slot = np.arange(rows) - np.repeat(np.cumsum(runs) - runs, runs)[:rows]
+
+    # half days run backwards from the last day, runs in the same half day are 40 minutes apart
+    day = half_day // 2 % HISTORY_DAYS
+    start_hour = np.where(half_day % 2 == 0, 7, 18)
+    start_seconds = start_hour * 3600 + slot * 2400 + rng.integers(0, 1800, size=rows)
+    start = (
+        np.datetime64(datetime.fromisoformat(last_day).date(), "s")
+        - day.astype("timedelta64[D]")
+        + start_seconds.astype("timedelta64[s]")
+    )
+
+    distance = rng.uniform(2, 22, size=rows).round(2)
+    pace = rng.integers(225, 380, size=rows)
+    moving = (distance * pace).astype(np.int64)
+    columns = COLUMNS[locale]
+    export = pd.DataFrame({
+        columns[0]: "Running",
+        columns[1]: pd.Series(start).dt.strftime("%Y-%m-%d %H:%M:%S"),
+        columns[2]: "false",
+        columns[3]: "Run",
+        columns[4]: distance,
+        columns[5]: (distance * 65).astype(int),
+        columns[6]: _clock(moving),
+        columns[7]: rng.integers(120, 175, size=rows),
+        columns[8]: rng.integers(160, 195, size=rows),
+        columns[9]: rng.uniform(1, 5, size=rows).round(1),
+        columns[10]: rng.integers(160, 185, size=rows),
+        columns[11]: rng.integers(185, 220, size=rows),
+        columns[12]: _pace(pace),
+        columns[13]: _pace(pace - rng.integers(20, 60, size=rows)),
+        columns[14]: rng.integers(0, 400, size=rows),
+        columns[15]: rng.integers(0, 400, size=rows),
+        columns[16]: rng.uniform(0.9, 1.4, size=rows).round(2),
+        columns[17]: rng.uniform(0, 15, size=rows).round(1),
+        columns[18]: rng.uniform(15, 30, size=rows).round(1),
+        columns[19]: _clock(moving),
+        columns[20]: _clock(moving + rng.integers(0, 300, size=rows)),
+        columns[21]: rng.integers(0, 100, size=rows),
+        columns[22]: rng.integers(100, 500, size=rows),
+    })
+    # Garmin exports list the newest activity first
+    order = np.argsort(-start.astype(np.int64), kind="stable")
+    return export.iloc[order].reset_index(drop=True)
+
+
+def write_export(path: str, rows: int, locale: str = "en", last_day: str = "2025-03-16", seed: int = 0) -> str:
+    synthetic_export(rows, locale, last_day, seed).to_csv(path, index=False)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a synthetic Garmin activities export")
+    parser.add_argument("path")
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--locale", choices=sorted(COLUMNS), default="en")
+    parser.add_argument("--last-day", default="2025-03-16")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    write_export(args.path, args.rows, args.locale, args.last_day, args.seed)
+
+
+if __name__ == "__main__":
+    main()
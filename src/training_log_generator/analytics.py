@@ -0,0 +1,108 @@
+from datetime import date, timedelta
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from durations import format_durations, parse_durations
+from rollup import Rollup
+
+# acute:chronic workload ratio, with distance as the load: the last week against the last four
+ACUTE_DAYS = 7
+CHRONIC_DAYS = 28
+LOAD_FIELDS = ["ACUTE_DISTANCE", "CHRONIC_DISTANCE", "ACWR"]
+
+
+class TrainingLoad:
+    # volume, distance-weighted pace and workload ratios for every day of a history; everything is
+    # read off running sums, so a figure for one day costs the same as the whole table
+    def __init__(self, rollup: Rollup, pace_distance: np.ndarray, paced_distance: np.ndarray,
+                 since: Optional[date] = None):
+        self.rollup = rollup
+        # running sums of pace x distance and of the distance those paces cover, aligned with the rollup's
+        self.pace_distance = pace_distance
+        self.paced_distance = paced_distance
+        # the first day the history is known to be complete from; ratios need CHRONIC_DAYS of it
+        self.since = since if since is not None else rollup.first_day
+
+    @classmethod
+    def from_frame(cls, data: pd.DataFrame, since: Optional[date] = None) -> "TrainingLoad":
+        # data shaped like DataLoader.load_data; pass since when it was loaded for a window
+        # that starts before its first run
+        data = data[data["Date"].notna()]
+        rollup = Rollup.from_frame(data)
+        if not rollup.days:
+            return cls(rollup, np.zeros(1), np.zeros(1), since)
+
+        offsets = ((data["Date"] - pd.Timestamp(rollup.first_day)) // timedelta(days=1)).to_numpy()
+        paces = data["Avg Pace"]
+        pace_seconds = (paces.astype(float) if pd.api.types.is_integer_dtype(paces) else parse_durations(paces)).to_numpy(float)
+        distances = pd.to_numeric(data["Distance"], errors="coerce").to_numpy(float)
+        paced = ~np.isnan(pace_seconds) & (distances > 0)
+        weights = np.where(paced, distances, 0.0)
+        return cls(
+            rollup,
+            np.concatenate([[0.0], np.cumsum(np.bincount(offsets, weights=np.where(paced, pace_seconds, 0.0) * weights, minlength=rollup.days))]),
+            np.concatenate([[0.0], np.cumsum(np.bincount(offsets, weights=weights, minlength=rollup.days))]),
+            since,
+        )
+
+    def daily(self) -> pd.DataFrame:
+        # one row per day of the history
+        starts = np.arange(self.rollup.days)
+        daily = self.rollup.daily_frame()[["distance", "seconds", "runs"]]
+        daily["pace"] = self.__pace(starts, starts + 1)
+        daily["acute"], daily["chronic"], daily["acwr"] = self.__ratios(starts)
+        return daily
+
+    def weekly(self) -> pd.DataFrame:
+        # one row per ISO week indexed by its monday, the ratios as of its sunday
+        weekly = self.rollup.weekly()[["distance", "seconds", "runs"]]
+        if weekly.empty:
+            return weekly.assign(pace=[], acute=[], chronic=[], acwr=[])
+        offsets = ((weekly.index - pd.Timestamp(self.rollup.first_day)) // timedelta(days=1)).to_numpy()
+        starts, ends = np.clip(offsets, 0, self.rollup.days), np.clip(offsets + 7, 0, self.rollup.days)
+        weekly["pace"] = self.__pace(starts, ends)
+        weekly["acute"], weekly["chronic"], weekly["acwr"] = self.__ratios(offsets + 6)
+        return weekly
+
+    def fields(self, last_day: date) -> Dict[str, str]:
+        # the LOAD_FIELDS template fields as of last_day: distance of the last ACUTE_DAYS, weekly average
+        # over the last CHRONIC_DAYS and their ratio, left empty without CHRONIC_DAYS of history
+        acute = self.rollup.totals(last_day - timedelta(days=ACUTE_DAYS - 1), last_day)["distance"]
+        chronic = self.rollup.totals(last_day - timedelta(days=CHRONIC_DAYS - 1), last_day)["distance"] * ACUTE_DAYS / CHRONIC_DAYS
+        known = (last_day - self.since).days + 1 >= CHRONIC_DAYS
+        return {
+            "ACUTE_DISTANCE": str(round(acute, 2)),
+            "CHRONIC_DISTANCE": str(round(chronic, 2)) if known else "",
+            "ACWR": f"{acute / chronic:.2f}" if known and chronic > 0 else "",
+        }
+
+    def __pace(self, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+        # "M:SS" distance-weighted paces between pairs of day offsets
+        distance = self.paced_distance[ends] - self.paced_distance[starts]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            seconds = np.where(distance > 0, (self.pace_distance[ends] - self.pace_distance[starts]) / distance, np.nan)
+        return format_durations(pd.Series(seconds), with_hours=False).to_numpy()
+
+    def __ratios(self, days: np.ndarray):
+        # acute and chronic weekly distances ending on each of the day offsets, and their ratio
+        prefix = self.rollup.prefix["distance"]
+        ends = np.clip(days + 1, 0, self.rollup.days)
+        acute = prefix[ends] - prefix[np.clip(days + 1 - ACUTE_DAYS, 0, self.rollup.days)]
+        chronic = (prefix[ends] - prefix[np.clip(days + 1 - CHRONIC_DAYS, 0, self.rollup.days)]) * ACUTE_DAYS / CHRONIC_DAYS
+        known = days - (self.since - self.rollup.first_day).days + 1 >= CHRONIC_DAYS
+        chronic = np.where(known, chronic, np.nan)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratio = np.where(chronic > 0, acute / chronic, np.nan)
+        return acute, chronic, ratio
+
+
+
+def load_fields(file_path, last_day: str, cache=None) -> Dict[str, str]:
+    # the LOAD_FIELDS of one report, from just the CHRONIC_DAYS up to its last day
+    from dataloader import DataLoader
+
+    history = DataLoader(file_path, last_day, CHRONIC_DAYS - 1, cache=cache).load_data()
+    last_day = pd.to_datetime(last_day).date()
+    return TrainingLoad.from_frame(history, last_day - timedelta(days=CHRONIC_DAYS - 1)).fields(last_day)
@@ -1,32 +1,98 @@
+import io
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
 import streamlit as st
+import streamlit.components.v1 as components
 
+from cache import hash_export
 from dataloader import DataLoader
-from report import ReportGenerator
+from formats import FORMATS, RENDERERS
 from renderer import TemplateRenderer
+from analytics import TrainingLoad
+from worker import generate_archive_bytes, generate_report_bytes, init_worker
+
+TEMPLATE_PATH = "data/log_template.docx"
+ZIP_MIME = "application/zip"
+# rendered reports kept per browser session, oldest dropped first
+SESSION_CACHE_SIZE = 8
+
+
+@st.cache_resource
+def get_worker_pool() -> ProcessPoolExecutor:
+    # shared by every session; each worker loads the template once. streamlit serves sessions
+    # from threads, so workers are spawned rather than forked
+    return ProcessPoolExecutor(mp_context=multiprocessing.get_context("spawn"), initializer=init_worker,
+                               initargs=(TEMPLATE_PATH, True))
+
+
+@st.cache_data(max_entries=SESSION_CACHE_SIZE)
+def get_training_load(export_hash: str, _csv_bytes: bytes) -> TrainingLoad:
+    # built once per export, keyed by its hash; every chart and range after that reads the running sums
+    return TrainingLoad.from_frame(DataLoader(io.BytesIO(_csv_bytes)).load_data())
+
+
+def show_history(load: TrainingLoad) -> None:
+    rollup = load.rollup
+    if not rollup.days:
+        st.info("No runs in this export")
+        return
+    first_day, last_day = st.slider("History", min_value=rollup.first_day, max_value=rollup.last_day,
+                                    value=(rollup.first_day, rollup.last_day))
+    totals = rollup.totals(first_day, last_day)
+    distance, runs, hours = st.columns(3)
+    distance.metric("Distance", f"{totals['distance']:.1f} km")
+    runs.metric("Runs", int(totals["runs"]))
+    hours.metric("Time", f"{totals['seconds'] / 3600:.1f} h")
+    weekly = rollup.weekly(first_day, last_day)
+    st.bar_chart(weekly["distance"], y_label="km per week")
+    st.bar_chart(weekly[["morning", "afternoon"]], y_label="runs per week")
+    ratios = load.weekly()
+    ratios = ratios[(ratios.index >= weekly.index[0]) & (ratios.index <= weekly.index[-1])]
+    st.line_chart(ratios["acwr"], y_label="acute:chronic distance ratio (7 / 28 days)")
+
 
 def run_app():
     st.title("Training Log Generator")
 
     start_day = st.date_input("Select Start Date")
-    output_path = "./Registo_Treino Diogo.docx"
+    season = st.checkbox("Every week of a season, as a zip of weekly logs")
+    if season:
+        weeks = st.number_input("Weeks up to the start date", min_value=1, max_value=104, value=16)
+        output_format, mime = "zip", ZIP_MIME
+        file_name = f"Registo_Treino Diogo ({weeks} semanas).zip"
+    else:
+        output_format = st.selectbox("Format", FORMATS, help="docx for the archival copy, html shows a preview here")
+        renderer = RENDERERS.get(output_format, TemplateRenderer)
+        mime = renderer.mime
+        file_name = f"Registo_Treino Diogo.{renderer.extension}"
 
     if file_path := st.file_uploader("Upload CSV File", type="csv"):
-        if st.button("Generate Report") and file_path is not None:
-            data_loader = DataLoader(file_path, start_day.isoformat(), 6)
-            data = data_loader.load_data()
-
-            report_generator = ReportGenerator(data)
-            report = report_generator.compile_report()
-
-            renderer = TemplateRenderer('data/log_template.docx')
+        csv_bytes = file_path.getvalue()
+        key = (hash_export(io.BytesIO(csv_bytes)), start_day.isoformat(), output_format, weeks if season else None)
+        reports = st.session_state.setdefault("reports", {})
 
-            renderer.render_report(report, output_path)
+        if st.checkbox("Show training history"):
+            show_history(get_training_load(key[0], csv_bytes))
 
-            st.write(f"Report saved to {output_path}")
+        if st.button("Generate Report") and key not in reports:
+            with st.spinner("Generating report..."):
+                if season:
+                    future = get_worker_pool().submit(generate_archive_bytes, csv_bytes, start_day.isoformat(), weeks, "Diogo")
+                else:
+                    future = get_worker_pool().submit(generate_report_bytes, csv_bytes, start_day.isoformat(), 6, output_format)
+                try:
+                    reports[key] = future.result()
+                except Exception as e:
+                    st.error(f"Could not generate the report: {e}")
+            while len(reports) > SESSION_CACHE_SIZE:
+                reports.pop(next(iter(reports)))
 
-            # add a button to download the report
-            st.download_button(label="Download Report", data=output_path, file_name="Registo_Treino Diogo.docx")
-            # st.download_button(label="Download Report", data=, file_name="Registo_Treino Diogo.docx", mime=)
+        if key in reports:
+            st.write("Report ready")
+            if output_format == "html":
+                components.html(reports[key].decode("utf-8"), height=600, scrolling=True)
+            st.download_button(label="Download Report", data=reports[key], file_name=file_name, mime=mime)
 
 if __name__ == "__main__":
     run_app()
@@ -0,0 +1,27 @@
+import zipfile
+from datetime import date
+from typing import BinaryIO, Dict, Union
+
+from instrumentation import stage
+from report_grid import ReportGrid
+
+
+# zip timestamps cannot go back further than this
+ZIP_EPOCH = date(1980, 1, 1)
+
+
+def week_file_name(name: str, monday: date, extension: str = "docx") -> str:
+    iso_year, iso_week, _ = monday.isocalendar()
+    return f"Registo_Treino {name} {iso_year}-W{iso_week:02d}.{extension}"
+
+
+def write_weekly_archive(weeks: Dict[date, ReportGrid], renderer, output: Union[str, BinaryIO], name: str) -> int:
+    # one document per week, each rendered straight into its zip entry, so only the week being
+    # rendered is ever in memory; works on unseekable outputs such as stdout or a socket too
+    with stage("archive", len(weeks)), zipfile.ZipFile(output, "w") as archive:
+        for monday, week in weeks.items():
+            # documents are already deflated, compressing them again only costs time
+            info = zipfile.ZipInfo(week_file_name(name, monday, renderer.extension), max(monday, ZIP_EPOCH).timetuple()[:6])
+            with archive.open(info, "w") as entry:
+                renderer.render_report(week, entry)
+    return len(weeks)
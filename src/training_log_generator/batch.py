@@ -0,0 +1,80 @@
+import argparse
+import csv
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional, Tuple
+
+from worker import generate_report_file, init_worker
+
+
+def load_manifest(manifest_path: str) -> Dict[str, str]:
+    # either a JSON object {"name": "export.csv"} or a two column CSV (name, path);
+    # relative export paths are resolved against the manifest's folder
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+    if manifest_path.endswith(".json"):
+        with open(manifest_path, encoding="utf-8") as f:
+            entries = list(json.load(f).items())
+    else:
+        with open(manifest_path, newline="", encoding="utf-8") as f:
+            entries = [(row[0].strip(), row[1].strip()) for row in csv.reader(f) if len(row) >= 2]
+        if entries and entries[0][0].lower() == "name":
+            entries = entries[1:]
+    return {name: os.path.join(base_dir, path) for name, path in entries}
+
+
+def run_batch(manifest: Dict[str, str], start_day: str, output_dir: str, template_path: str = "data/log_template.docx",
+              workers: Optional[int] = None, number_of_days: int = 6, use_cache: bool = True) -> Tuple[Dict[str, str], Dict[str, str]]:
+    os.makedirs(output_dir, exist_ok=True)
+    generated: Dict[str, str] = {}
+    failed: Dict[str, str] = {}
+    rows = 0
+    started = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(template_path, use_cache)) as pool:
+        futures = {
+            pool.submit(generate_report_file, name, csv_path, start_day, number_of_days, output_dir): name
+            for name, csv_path in manifest.items()
+        }
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                output_path, athlete_rows = future.result()
+            except Exception as e:
+                # one bad export should not abort the whole batch
+                failed[name] = f"{type(e).__name__}: {e}"
+                print(f"FAILED {name}: {failed[name]}")
+                continue
+            generated[name] = output_path
+            rows += athlete_rows
+            print(f"{name}: {output_path}")
+
+    elapsed = time.perf_counter() - started
+    print(
+        f"Generated {len(generated)}/{len(manifest)} reports ({rows} activities) in {elapsed:.2f}s "
+        f"- {len(generated) / elapsed if elapsed else 0.0:.1f} reports/s"
+    )
+    return generated, failed
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Generate weekly training logs for many athletes")
+    parser.add_argument("manifest", help="JSON object or two column CSV mapping athlete names to export paths")
+    parser.add_argument("--start-day", required=True, help="last day of the week, e.g. 2024/03/10")
+    parser.add_argument("--output-dir", required=True)
+    parser.add_argument("--template", default="data/log_template.docx")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per CPU)")
+    parser.add_argument("--days", type=int, default=6, help="days to look back from the start day")
+    parser.add_argument("--no-cache", action="store_true", help="always re-parse the exports")
+    args = parser.parse_args(argv)
+
+    _, failed = run_batch(
+        load_manifest(args.manifest), args.start_day, args.output_dir, args.template,
+        args.workers, args.days, not args.no_cache,
+    )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,100 @@
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+from typing import Dict, IO, Optional, Union
+
+import pandas as pd
+
+
+def default_cache_dir() -> Path:
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return Path(base) / "training_log_generator"
+
+
+def hash_export(file: Union[str, IO[bytes]], block_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    if hasattr(file, "read"):
+        # uploaded files (e.g. from streamlit) are read and rewound so the parser still sees the whole file
+        file.seek(0)
+        for block in iter(lambda: file.read(block_size), b""):
+            digest.update(block if isinstance(block, bytes) else block.encode())
+        file.seek(0)
+    else:
+        with open(file, "rb") as f:
+            for block in iter(lambda: f.read(block_size), b""):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+# parsed exports are stored as Feather files and evicted least recently used first
+class ParsedExportCache:
+    SUFFIX = ".feather"
+
+    def __init__(self, directory: Optional[Union[str, Path]] = None, max_bytes: int = 256 * 1024 * 1024):
+        self.directory = Path(directory) if directory else default_cache_dir()
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def key_for(self, file: Union[str, IO[bytes]], version: str) -> str:
+        return f"{hash_export(file)}-{version}"
+
+    def get(self, key: str) -> Optional[pd.DataFrame]:
+        path = self.__path(key)
+        try:
+            df = pd.read_feather(path)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except (OSError, ValueError):
+            # a truncated or corrupt entry (pyarrow.ArrowInvalid is a ValueError) is dropped and re-parsed
+            path.unlink(missing_ok=True)
+            self.misses += 1
+            return None
+        # the modification time doubles as the last access time for eviction
+        os.utime(path)
+        self.hits += 1
+        return df
+
+    def put(self, key: str, df: pd.DataFrame) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        os.close(fd)
+        try:
+            df.reset_index(drop=True).to_feather(tmp_path)
+            os.replace(tmp_path, self.__path(key))
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        self.__evict()
+
+    def clear(self) -> None:
+        for path in self.__entries():
+            path.unlink(missing_ok=True)
+
+    def stats(self) -> Dict[str, int]:
+        entries = self.__entries()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(entries),
+            "bytes": sum(path.stat().st_size for path in entries),
+        }
+
+    def __path(self, key: str) -> Path:
+        return self.directory / f"{key}{self.SUFFIX}"
+
+    def __entries(self):
+        if not self.directory.is_dir():
+            return []
+        return list(self.directory.glob(f"*{self.SUFFIX}"))
+
+    def __evict(self) -> None:
+        entries = sorted(((path.stat(), path) for path in self.__entries()), key=lambda entry: entry[0].st_mtime)
+        total = sum(stat.st_size for stat, _ in entries)
+        for stat, path in entries:
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= stat.st_size
@@ -1,3 +1,4 @@
+import os
 import tkinter as tk
 from tkinter import filedialog
 from datetime import datetime, timedelta
@@ -5,6 +6,7 @@ from datetime import datetime, timedelta
 from dataloader import DataLoader
 from report import ReportGenerator
 from renderer import TemplateRenderer
+from cache import ParsedExportCache
 
 
 class GUIApplication:
@@ -52,13 +54,13 @@ class GUIApplication:
     def run_analysis(self):
         name = self.name_entry.get()
         start_day = self.start_day_entry.get()
-        file_path = filedialog.askopenfilename(initialdir="/", title="Select file", filetypes=[("CSV files", "*.csv"), ("all files", "*.*")])
+        file_path = filedialog.askopenfilename(initialdir=os.path.expanduser("~"), title="Select file", filetypes=[("CSV files", "*.csv"), ("all files", "*.*")])
 
-        data_loader = DataLoader(file_path, start_day, 6)
+        data_loader = DataLoader(file_path, start_day, 6, cache=ParsedExportCache())
         df = data_loader.load_data()
 
         report_generator = ReportGenerator(df)
-        report = report_generator.compile_report()
+        report = report_generator.compile_grid(start_day, 6)
 
         template_renderer = TemplateRenderer('data/log_template.docx')
         output_path = f'./Registo_Treino {name}.docx'
@@ -0,0 +1,65 @@
+import re
+from typing import Dict, List, Optional, Union
+from xml.sax.saxutils import escape
+
+from docx_package import TemplatePackage
+
+# the parts docxtpl renders: main document, headers, footers, footnotes and core properties
+RENDERED_PARTS = re.compile(r"^(word/(document|header\d*|footer\d*|footnotes)\.xml|docProps/core\.xml)$")
+PLACEHOLDER = re.compile(rb"\{\{\s*([A-Z_]+)\s*\}\}")
+JINJA_MARKERS = (b"{{", b"{%", b"{#")
+
+
+class CompiledTemplate:
+    # a template made only of flat {{ NAME }} placeholders, each written out in one piece, renders by
+    # splicing the escaped values between the fixed stretches of XML around them
+    def __init__(self, parts: Dict[str, List[Union[bytes, str]]]):
+        # per part, literal XML at even positions and placeholder names at odd ones
+        self.parts = parts
+
+    @classmethod
+    def compile(cls, package: TemplatePackage) -> Optional["CompiledTemplate"]:
+        # None when any part needs real Jinja: control flow, comments, expressions, filters,
+        # or a placeholder Word has split across runs (which docxtpl stitches back together)
+        parts = {}
+        for name in sorted(package.names):
+            if not RENDERED_PARTS.match(name):
+                continue
+            xml = package.read(name)
+            if not any(marker in xml for marker in JINJA_MARKERS):
+                continue
+            if b"{%" in xml or b"{#" in xml:
+                return None
+
+            segments: List[Union[bytes, str]] = []
+            position = 0
+            for placeholder in PLACEHOLDER.finditer(xml):
+                segments.append(xml[position:placeholder.start()])
+                segments.append(placeholder.group(1).decode("ascii"))
+                position = placeholder.end()
+            segments.append(xml[position:])
+
+            literals = segments[::2]
+            if any(b"{{" in literal or b"}}" in literal for literal in literals):
+                return None
+            parts[name] = segments
+        return cls(parts)
+
+    @property
+    def placeholders(self) -> List[str]:
+        return [name for segments in self.parts.values() for name in segments[1::2]]
+
+    def render(self, context: Dict[str, object]) -> Dict[str, bytes]:
+        # like Jinja, missing names render as empty strings
+        values: Dict[str, bytes] = {}
+        rendered = {}
+        for name, segments in self.parts.items():
+            pieces = list(segments)
+            for i in range(1, len(pieces), 2):
+                key = pieces[i]
+                if key not in values:
+                    values[key] = escape(str(context.get(key, ""))).encode("utf-8")
+                pieces[i] = values[key]
+            # join sizes the output once and copies every piece into it
+            rendered[name] = b"".join(pieces)
+        return rendered
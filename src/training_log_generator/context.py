@@ -0,0 +1,72 @@
+from datetime import date
+from typing import Dict, Optional, Union
+
+from instrumentation import logger, stage
+from report_grid import ReportGrid
+
+# a compiled report, or the nested dicts of ReportGenerator.compile_report
+Report = Union[ReportGrid, Dict[date, Dict[str, list]]]
+
+DAYS_OF_WEEK = ["MONDAY", "TUESDAY", "WEDNESDAY", "THURSDAY", "FRIDAY", "SATURDAY", "SUNDAY"]
+
+
+def prepare_context(data: Report, start_date: Optional[date] = None) -> Dict[str, str]:
+    # the DATE_/TIME_/DIST_/PACE_ fields of the weekly template, shared by every output format
+    grid = as_grid(data, start_date)
+    with stage("render.context", grid.run_count()):
+        return _prepare_context(grid)
+
+
+def as_grid(data: Report, start_date: Optional[date] = None) -> ReportGrid:
+    if isinstance(data, ReportGrid):
+        return data if start_date is None or start_date == data.first_day else data.window(start_date, len(DAYS_OF_WEEK))
+    return ReportGrid.from_report(data, start_date, None if start_date is None else len(DAYS_OF_WEEK))
+
+
+def _prepare_context(grid: ReportGrid) -> Dict[str, str]:
+    # the template has one column per day, filled from the first seven days of the grid;
+    # runs with a warm up, main workout and cool down are already in the order they were run
+    context = {}
+    for i, day in enumerate(DAYS_OF_WEEK):
+        date_str = grid.day(i).strftime("%Y-%m-%d")
+        morning_data = grid.runs(i, 0)
+        afternoon_data = grid.runs(i, 1)
+
+        morning_time = ", ".join([run.time for run in morning_data])
+        morning_dist = ", ".join([str(run.distance) for run in morning_data])
+        morning_pace = ", ".join([run.pace for run in morning_data])
+
+        afternoon_time = ", ".join([run.time for run in afternoon_data])
+        afternoon_dist = ", ".join([str(run.distance) for run in afternoon_data])
+        afternoon_pace = ", ".join([run.pace for run in afternoon_data])
+
+        context[f"DATE_{day}"] = date_str
+        context[f"TIME_{day}_MORN"] = morning_time
+        context[f"DIST_{day}_MORN"] = morning_dist
+        context[f"PACE_{day}_MORN"] = morning_pace
+        context[f"TIME_{day}_AFTER"] = afternoon_time
+        context[f"DIST_{day}_AFTER"] = afternoon_dist
+        context[f"PACE_{day}_AFTER"] = afternoon_pace
+
+        logger.debug(
+            "%s: Date: %s, Morning: %s, %s, %s, Afternoon: %s, %s, %s",
+            day, date_str, morning_time, morning_dist, morning_pace, afternoon_time, afternoon_dist, afternoon_pace,
+        )
+
+    week = len(DAYS_OF_WEEK)
+    context["WEEKLY_DISTANCE"] = str(round(grid.total_distance(0, week), 2))
+    context["WEEKLY_TIME"] = _format_seconds(grid.total_seconds(0, week), True)
+    pace = grid.weighted_pace(0, week)
+    context["WEEKLY_PACE"] = "" if pace is None else _format_seconds(pace, False)
+    context["WEEKLY_RUNS"] = str(sum(len(grid.runs(offset, period)) for offset in range(week) for period in (0, 1)))
+    # anything worked out beyond the week, e.g. the training load fields of analytics.TrainingLoad
+    context.update(grid.fields)
+    return context
+
+
+def _format_seconds(seconds: float, with_hours: bool) -> str:
+    # like durations.format_durations for a single value, without pandas
+    whole = round(seconds)
+    if not with_hours:
+        return f"{whole // 60}:{whole % 60:02d}"
+    return f"{whole // 3600:02d}:{whole % 3600 // 60:02d}:{whole % 60:02d}"
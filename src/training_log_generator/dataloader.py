@@ -1,46 +1,227 @@
+import io
+import logging
+import os
+import numpy as np
 import pandas as pd
 from datetime import timedelta
-from typing import Optional
+from typing import IO, Iterator, List, Optional, Union
+
+from cache import ParsedExportCache
+from durations import pace_from_speed, parse_durations
+from engines import DATE_FORMATS, DATE_FORMAT_SAMPLE_SIZE, choose_engine, read_pyarrow
+from instrumentation import logger, stage
+from schema import detect_schema
+from sorted_export import read_window
+from tracks import read_tracks
+
+PARSED_COLUMNS = ["Date", "Time_of_Day", "Distance", "Time", "Avg Pace", "am_pm"]
+
+# bump whenever the parsed frame changes shape, so stale cache entries are not reused
+LOADER_VERSION = "4"
+
+# rows that must have been read in date order before a chunked load trusts the export to be sorted
+MIN_SORTED_ROWS = 200
 
 
 class DataLoader:
-    def __init__(self, file_path: str, start_day: str, number_of_days: int):
+    def __init__(self, file_path: str, start_day: Optional[str] = None, number_of_days: int = 6,
+                 chunksize: Optional[int] = None, cache: Optional[ParsedExportCache] = None,
+                 project: bool = True, compact: bool = False, engine: str = "auto", seek: bool = False):
+        # without a start day the whole history is loaded
         self.file_path = file_path
         self.start_day = start_day
         self.number_of_days = number_of_days
+        # when set, the export is streamed in chunks of this many rows and only
+        # the rows inside the date window are kept in memory
+        self.chunksize = chunksize
+        # parsed exports are reused across runs when a cache is given, pass None to bypass it
+        self.cache = cache
+        # project reads only the columns the report needs; compact also stores distance as float32,
+        # Time and Avg Pace as whole seconds and am_pm as a category
+        self.project = project
+        self.compact = compact
+        # "pandas", "pyarrow" or "auto" to pick by file size; the loader always builds a frame,
+        # so "stdlib" (see engines.compile_report) falls back to pandas here
+        self.engine = engine
+        # with seek, an export on disk known to be in date order is binary searched for the window and only
+        # that slice is parsed; order is only sampled, so a single activity out of place elsewhere in the
+        # file would be missed, and it is off unless asked for. Without it (and for file objects or
+        # without a start day) the export is read in full
+        self.seek = seek
+        # file_path may also be a folder of GPX/TCX tracks, summarised by tracks.read_tracks
+        self.tracks = isinstance(file_path, str) and os.path.isdir(file_path)
         self.data: Optional[pd.DataFrame] = None
 
     def load_data(self) -> pd.DataFrame:
-        df = pd.read_csv(self.file_path)
-        self.data = self.__preprocess(df)
+        with stage("load") as load_stage:
+            if self.chunksize:
+                self.data = self.__load_in_chunks()
+            else:
+                df = self.__load_window()
+                if df is None:
+                    df = self.__load_parsed()
+                self.data = self.filter_by_date(df)
+            load_stage.rows = len(self.data)
+        # memory_usage(deep=True) walks every string, so it is only measured when it is logged
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Loaded %d activities using %d bytes", len(self.data), self.memory_footprint())
         return self.data
 
-    def __preprocess(self, df: pd.DataFrame) -> pd.DataFrame:
-        try:
-            df = self.__create_date_and_time_columns(df)
-            df = self.__filter_by_date(df)
-        except KeyError:
-            df = self.__rename_columns_for_portuguese(df)
+    def memory_footprint(self) -> int:
+        if self.data is None:
+            return 0
+        return int(self.data.memory_usage(deep=True).sum())
+
+    def __load_window(self) -> Optional[pd.DataFrame]:
+        if self.tracks or not (self.seek and self.start_day is not None and isinstance(self.file_path, str)):
+            return None
+        with stage("load.seek"):
+            last_day = pd.to_datetime(self.start_day).normalize()
+            window = read_window(self.file_path, (last_day - timedelta(days=self.number_of_days)).date(), last_day.date())
+        if window is None:
+            return None
+        return self.parse_dates(self.__read_csv(io.BytesIO(window)))
+
+    def __load_parsed(self) -> pd.DataFrame:
+        if self.tracks:
+            return self.parse_dates(read_tracks(self.file_path))
+        if self.cache is None:
+            return self.parse_dates(self.__read_csv())
+
+        with stage("load.cache_lookup"):
+            key = self.cache.key_for(self.file_path, f"{LOADER_VERSION}{'p' if self.project else ''}{'c' if self.compact else ''}")
+            df = self.cache.get(key)
+        if df is None:
+            df = self.parse_dates(self.__read_csv())
+            with stage("load.cache_store", len(df)):
+                self.cache.put(key, df)
+        return df
+
+    def __read_csv(self, source: Union[str, IO[bytes], None] = None) -> pd.DataFrame:
+        source = self.file_path if source is None else source
+        with stage("load.read_csv") as read_stage:
+            columns = self.__resolve_columns(source)
+            if choose_engine(source, self.engine) == "pyarrow":
+                df = read_pyarrow(source, usecols=columns)
+            else:
+                df = pd.read_csv(source, usecols=columns)
+            read_stage.rows = len(df)
+        return df
+
+    def read_chunks(self, chunksize: int) -> Iterator[pd.DataFrame]:
+        # parsed but unfiltered chunks of the export, in file order; always read by pandas,
+        # whose chunks are counted in rows
+        if self.tracks:
+            yield self.parse_dates(read_tracks(self.file_path))
+            return
+        columns = self.__resolve_columns(self.file_path)
+        for chunk in pd.read_csv(self.file_path, usecols=columns, chunksize=chunksize):
+            yield self.parse_dates(chunk)
+
+    def __resolve_columns(self, source: Union[str, IO[bytes]]) -> Optional[List[str]]:
+        # the export's own names for the report columns, from the header alone
+        if not self.project:
+            return None
+        header = list(pd.read_csv(source, nrows=0).columns)
+        if hasattr(source, "seek"):
+            source.seek(0)
+        return list(detect_schema(header).columns)
+
+    def __load_in_chunks(self) -> pd.DataFrame:
+        if self.start_day is None:
+            frames = list(self.read_chunks(self.chunksize))
+            return pd.concat(frames) if frames else pd.DataFrame(columns=PARSED_COLUMNS)
+
+        last_day = pd.to_datetime(self.start_day).normalize()
+        first_day = last_day - timedelta(days=self.number_of_days)
+
+        frames: List[pd.DataFrame] = []
+        newest_first, oldest_first = True, True
+        first_date = previous_date = None
+        rows_read = 0
+
+        for chunk in self.read_chunks(self.chunksize):
+            frames.append(self.filter_by_date(chunk))
+
+            dates = chunk["Date"].dropna()
+            if dates.empty:
+                continue
+
+            # keep track of whether everything read so far is sorted, across chunk boundaries too
+            newest_first = newest_first and dates.is_monotonic_decreasing and (previous_date is None or previous_date >= dates.iloc[0])
+            oldest_first = oldest_first and dates.is_monotonic_increasing and (previous_date is None or previous_date <= dates.iloc[0])
+            first_date = dates.iloc[0] if first_date is None else first_date
+            previous_date = dates.iloc[-1]
+            rows_read += len(dates)
+
+            # rows of a single date are sorted both ways, so the direction only counts once two dates
+            # have set it, and a few rows in order by chance (small chunks of a shuffled export) do not
+            if first_date == previous_date or rows_read < MIN_SORTED_ROWS:
+                continue
+            # the rest of a sorted export lies entirely outside the window
+            if (newest_first and previous_date < first_day) or (oldest_first and previous_date > last_day):
+                break
+
+        if not frames:
+            return pd.DataFrame(columns=PARSED_COLUMNS)
+
+        return pd.concat(frames)
+
+    def parse_dates(self, df: pd.DataFrame) -> pd.DataFrame:
+        with stage("load.parse_dates", len(df)):
+            # the header says which language the export is in, so every export is parsed once
+            schema = detect_schema(df.columns)
+            if any(variant != name for variant, name in schema.columns.items()):
+                df = df.rename(columns=schema.columns)
+            if schema.speed:
+                df["Avg Pace"] = pace_from_speed(df.pop("Avg Speed"))
             df = self.__create_date_and_time_columns(df)
-            df = self.__filter_by_date(df)
-        df["am_pm"] = df["Time_of_Day"].apply(self.__morning_or_afternoon)
+            if self.compact:
+                df = self.__compact(df)
         return df
 
-    def __rename_columns_for_portuguese(self, df: pd.DataFrame) -> pd.DataFrame:
-        df.rename(columns={"Data": "Date", "Distância": "Distance", "Tempo": "Time", "Ritmo médio": "Avg Pace", "Velocidade média": "Avg Pace",}, inplace=True)
+    @staticmethod
+    def __compact(df: pd.DataFrame) -> pd.DataFrame:
+        df["Distance"] = df["Distance"].astype(np.float32)
+        df["Time"] = parse_durations(df["Time"]).round().astype("Int32")
+        df["Avg Pace"] = parse_durations(df["Avg Pace"]).round().astype("Int32")
+        df["am_pm"] = pd.Categorical(df["am_pm"], categories=["morning", "afternoon"])
         return df
 
     def __create_date_and_time_columns(self, df: pd.DataFrame) -> pd.DataFrame:
-        df[['Date', 'Time_of_Day']] = df['Date'].str.split(' ', expand=True)
-        df['Date'] = pd.to_datetime(df['Date']).dt.date
-        df['Time_of_Day'] = pd.to_datetime(df['Time_of_Day']).dt.time
+        start = self.__parse_start_times(df["Date"])
+        df["Date"] = start.dt.normalize()
+        df["Time_of_Day"] = start - df["Date"]
+        df["am_pm"] = np.where(start.dt.hour < 12, "morning", "afternoon")
         return df
 
-    def __filter_by_date(self, df: pd.DataFrame) -> pd.DataFrame:
-        start_datetime = pd.to_datetime(self.start_day)
-        date_filter = start_datetime - timedelta(days=self.number_of_days)
-        return df[(df["Date"] >= date_filter.date()) & (df["Date"] <= start_datetime.date())]
-
     @staticmethod
-    def __morning_or_afternoon(time: pd.Timestamp) -> str:
-        return "morning" if time.hour < 12 else "afternoon"
+    def __parse_start_times(column: pd.Series) -> pd.Series:
+        # pick the first known format that parses a sample of the column, then parse the whole column once with it
+        sample = column.dropna().head(DATE_FORMAT_SAMPLE_SIZE)
+        for date_format in DATE_FORMATS:
+            if pd.to_datetime(sample, format=date_format, errors="coerce").notna().all():
+                parsed = pd.to_datetime(column, format=date_format, errors="coerce")
+                break
+        else:
+            return pd.to_datetime(column, format="mixed")
+
+        # rows further down in another format are parsed with the other known formats, then guessed,
+        # rather than dropped; anything still unreadable raises like a full mixed parse would
+        unparsed = parsed.isna() & column.notna()
+        for other_format in DATE_FORMATS:
+            if not unparsed.any():
+                return parsed
+            parsed[unparsed] = pd.to_datetime(column[unparsed], format=other_format, errors="coerce")
+            unparsed = parsed.isna() & column.notna()
+        if unparsed.any():
+            parsed[unparsed] = pd.to_datetime(column[unparsed], format="mixed")
+        return parsed
+
+    def filter_by_date(self, df: pd.DataFrame) -> pd.DataFrame:
+        if self.start_day is None:
+            return df
+        with stage("load.filter", len(df)):
+            start_datetime = pd.to_datetime(self.start_day).normalize()
+            date_filter = start_datetime - timedelta(days=self.number_of_days)
+            return df[(df["Date"] >= date_filter) & (df["Date"] <= start_datetime)]
@@ -0,0 +1,116 @@
+import struct
+import zipfile
+import zlib
+from io import BytesIO
+from typing import BinaryIO, Dict, List, NamedTuple, Union
+
+LOCAL_HEADER = struct.Struct("<IHHHHHIIIHH")
+CENTRAL_HEADER = struct.Struct("<IHHHHHHIIIHHHHHII")
+END_OF_CENTRAL_DIRECTORY = struct.Struct("<IHHHHIIH")
+LOCAL_HEADER_SIGNATURE = 0x04034B50
+CENTRAL_HEADER_SIGNATURE = 0x02014B50
+END_OF_CENTRAL_DIRECTORY_SIGNATURE = 0x06054B50
+UTF8_FLAG = 0x800
+VERSION = 20
+
+
+class Member(NamedTuple):
+    filename: str
+    name: bytes
+    flags: int
+    dos_time: int
+    dos_date: int
+    external_attr: int
+    crc: int
+    compress_type: int
+    compress_size: int
+    file_size: int
+    data: memoryview
+
+
+class TemplatePackage:
+    # keeps the compressed members of a .docx template in memory, so rendering a report only
+    # compresses the parts that actually changed and copies every other member byte for byte
+    def __init__(self, template_bytes: bytes):
+        self.template_bytes = template_bytes
+        self.members: List[Member] = []
+        self.names = set()
+        buffer = memoryview(template_bytes)
+
+        with zipfile.ZipFile(BytesIO(template_bytes)) as archive:
+            for info in archive.infolist():
+                # the local header may carry its own extra field, so its length is read from there
+                header = LOCAL_HEADER.unpack_from(buffer, info.header_offset)
+                data_start = info.header_offset + LOCAL_HEADER.size + header[9] + header[10]
+                name, name_flag = self.__encode_name(info.filename)
+                # sizes and crc are always written in the local header, so no data descriptor is needed
+                flags = (info.flag_bits & ~0x08 & ~UTF8_FLAG) | name_flag
+                self.members.append(Member(
+                    info.filename, name, flags, *self.__dos_date_time(info.date_time), info.external_attr, info.CRC,
+                    info.compress_type, info.compress_size, info.file_size,
+                    buffer[data_start:data_start + info.compress_size],
+                ))
+                self.names.add(info.filename)
+
+    def read(self, filename: str) -> bytes:
+        with zipfile.ZipFile(BytesIO(self.template_bytes)) as archive:
+            return archive.read(filename)
+
+    def write(self, output: Union[str, BinaryIO], rendered: Dict[str, bytes]) -> None:
+        if isinstance(output, str):
+            with open(output, "wb") as f:
+                self.__write(f, rendered)
+        else:
+            self.__write(output, rendered)
+
+    def __write(self, output: BinaryIO, rendered: Dict[str, bytes]) -> None:
+        # the offset is tracked by hand so non-seekable outputs work as well
+        offset = 0
+        central_directory = []
+
+        for member in self.members:
+            if member.filename in rendered:
+                member = self.__compress(member, rendered[member.filename])
+
+            header = LOCAL_HEADER.pack(
+                LOCAL_HEADER_SIGNATURE, VERSION, member.flags, member.compress_type, member.dos_time,
+                member.dos_date, member.crc, member.compress_size, member.file_size, len(member.name), 0,
+            )
+            output.write(header)
+            output.write(member.name)
+            output.write(member.data)
+
+            central_directory.append(CENTRAL_HEADER.pack(
+                CENTRAL_HEADER_SIGNATURE, VERSION, VERSION, member.flags, member.compress_type, member.dos_time,
+                member.dos_date, member.crc, member.compress_size, member.file_size, len(member.name), 0, 0, 0, 0,
+                member.external_attr, offset,
+            ) + member.name)
+            offset += len(header) + len(member.name) + len(member.data)
+
+        directory = b"".join(central_directory)
+        output.write(directory)
+        output.write(END_OF_CENTRAL_DIRECTORY.pack(
+            END_OF_CENTRAL_DIRECTORY_SIGNATURE, 0, 0, len(central_directory), len(central_directory),
+            len(directory), offset, 0,
+        ))
+
+    @staticmethod
+    def __compress(member: Member, content: bytes) -> Member:
+        compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -15)
+        data = compressor.compress(content) + compressor.flush()
+        return member._replace(
+            crc=zlib.crc32(content), compress_type=zipfile.ZIP_DEFLATED,
+            compress_size=len(data), file_size=len(content), data=memoryview(data),
+        )
+
+    @staticmethod
+    def __encode_name(filename: str):
+        try:
+            return filename.encode("ascii"), 0
+        except UnicodeEncodeError:
+            return filename.encode("utf-8"), UTF8_FLAG
+
+    @staticmethod
+    def __dos_date_time(date_time):
+        year, month, day, hour, minute, second = date_time
+        return (hour << 11) | (minute << 5) | (second // 2), ((year - 1980) << 9) | (month << 5) | day
@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+
+
+def parse_durations(values: pd.Series) -> pd.Series:
+    # "01:16:22", "45:12" and "4:53" style strings to seconds, in one vectorized pass;
+    # missing or unreadable values become NaN
+    if values.empty:
+        return pd.Series(dtype=float, index=values.index)
+    parts = values.astype("string").str.split(":", expand=True)
+    parts = parts.apply(pd.to_numeric, errors="coerce")
+    if parts.shape[1] == 0:
+        return pd.Series(np.nan, index=values.index, dtype=float)
+    if parts.shape[1] == 1:
+        return parts[0].astype(float)
+    if parts.shape[1] == 2:
+        return (parts[0] * 60 + parts[1]).astype(float)
+    has_hours = parts[2].notna()
+    return pd.Series(
+        np.where(has_hours, parts[0] * 3600 + parts[1] * 60 + parts[2], parts[0] * 60 + parts[1]),
+        index=values.index,
+    )
+
+
+def format_durations(seconds: pd.Series, with_hours: bool = True) -> pd.Series:
+    # the inverse of parse_durations: "HH:MM:SS" for durations, "M:SS" for paces
+    whole = seconds.round().astype("Int64")
+    minutes = (whole // 60 if not with_hours else whole % 3600 // 60).astype("string")
+    formatted = (minutes.str.zfill(2) if with_hours else minutes) + ":" + (whole % 60).astype("string").str.zfill(2)
+    if with_hours:
+        formatted = (whole // 3600).astype("string").str.zfill(2) + ":" + formatted
+    return formatted.astype(object).where(whole.notna(), None)
+
+
+def pace_from_speed(values: pd.Series) -> pd.Series:
+    # average speeds in km/h ("12.5", or "12,5" in some languages) to "M:SS" paces per km; a missing
+    # or zero speed (Garmin writes "--") has no pace and is left empty, like an empty pace cell
+    speeds = pd.to_numeric(values.astype("string").str.replace(",", ".", regex=False), errors="coerce")
+    return format_durations(3600 / speeds.where(speeds > 0), with_hours=False).fillna("")
@@ -0,0 +1,247 @@
+import csv
+import importlib.util
+import io
+import math
+import os
+from datetime import date, datetime, timedelta
+from typing import IO, Dict, List, Optional, Union
+
+from instrumentation import stage
+from report_grid import ReportGrid
+from schema import detect_schema, text_column_names
+
+# this module must not import pandas at load time: the stdlib engine exists so that small
+# exports can be reported on without paying for the pandas import
+
+ENGINES = ["auto", "pandas", "pyarrow", "stdlib"]
+
+# auto mode: below this the pandas import costs more than parsing, above the other one
+# the multithreaded Arrow reader wins clearly over the pandas C parser
+STDLIB_MAX_BYTES = 1 << 20
+PYARROW_MIN_BYTES = 32 << 20
+
+# start timestamps as written by Garmin Connect in English and Portuguese exports
+DATE_FORMATS = ["%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%d/%m/%Y %H:%M:%S", "%d/%m/%Y %H:%M"]
+DATE_FORMAT_SAMPLE_SIZE = 100
+
+# report columns read as text whatever they look like (see schema for the export names)
+TEXT_COLUMNS = ["Date", "Time", "Avg Pace", "Avg Speed"]
+
+# the strings pandas.read_csv reads as missing, shared by every engine so they agree on gaps
+NA_VALUES = frozenset([
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+    "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+])
+
+
+class UnsupportedExport(ValueError):
+    # raised by the stdlib engine for exports it cannot read exactly like pandas would
+    pass
+
+
+def pyarrow_available() -> bool:
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def export_size(file_path: Union[str, IO[bytes]]) -> int:
+    if hasattr(file_path, "seek"):
+        position = file_path.tell()
+        size = file_path.seek(0, os.SEEK_END)
+        file_path.seek(position)
+        return size
+    return os.path.getsize(file_path)
+
+
+def choose_engine(file_path: Union[str, IO[bytes]], engine: str = "auto") -> str:
+    if engine not in ENGINES:
+        raise ValueError(f"unknown engine {engine!r}, expected one of {', '.join(ENGINES)}")
+    if isinstance(file_path, str) and os.path.isdir(file_path):
+        # a folder of GPX/TCX tracks, which only DataLoader reads
+        return "pandas"
+    if engine != "auto":
+        return engine
+    size = export_size(file_path)
+    if size <= STDLIB_MAX_BYTES:
+        return "stdlib"
+    if size >= PYARROW_MIN_BYTES and pyarrow_available():
+        return "pyarrow"
+    return "pandas"
+
+
+def read_pyarrow(file_path: Union[str, IO[bytes]], usecols: Optional[List[str]] = None):
+    import numpy as np
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+
+    # timestamps and durations stay text, so they go through the same parsing as the pandas engine
+    text_columns = {variant: pa.string() for variant in text_column_names(TEXT_COLUMNS)}
+    table = pa_csv.read_csv(
+        file_path,
+        read_options=pa_csv.ReadOptions(use_threads=True),
+        convert_options=pa_csv.ConvertOptions(
+            include_columns=usecols,
+            column_types=text_columns,
+            null_values=list(NA_VALUES),
+            strings_can_be_null=True,
+        ),
+    )
+    df = table.to_pandas()
+    # Arrow hands missing text back as None, pandas as NaN
+    for column in df.columns[df.dtypes == object]:
+        df[column] = df[column].where(df[column].notna(), np.nan)
+    return df
+
+
+def compile_report(file_path: Union[str, IO[bytes]], start_day: Optional[str] = None, number_of_days: int = 6,
+                   engine: str = "auto", cache=None, seek: bool = False) -> Dict[date, Dict[str, list]]:
+    # the same report as DataLoader + ReportGenerator.compile_report, with the parse engine picked per export
+    engine = choose_engine(file_path, engine)
+    if engine == "stdlib":
+        try:
+            return compile_report_stdlib(file_path, start_day, number_of_days)
+        except UnsupportedExport:
+            engine = "pandas"
+            if hasattr(file_path, "seek"):
+                file_path.seek(0)
+
+    from dataloader import DataLoader
+    from report import ReportGenerator
+
+    data = DataLoader(file_path, start_day, number_of_days, cache=cache, engine=engine, seek=seek).load_data()
+    return ReportGenerator(data).compile_report()
+
+
+def compile_grid(file_path: Union[str, IO[bytes]], start_day: Optional[str] = None, number_of_days: int = 6,
+                 engine: str = "auto", cache=None, seek: bool = False) -> ReportGrid:
+    # compile_report as a ReportGrid covering the whole window, including days without runs
+    engine = choose_engine(file_path, engine)
+    if engine == "stdlib":
+        try:
+            report = compile_report_stdlib(file_path, start_day, number_of_days)
+            if start_day is None:
+                return ReportGrid.from_report(report)
+            return ReportGrid.from_report(report, _parse_day(start_day) - timedelta(days=number_of_days), number_of_days + 1)
+        except UnsupportedExport:
+            engine = "pandas"
+            if hasattr(file_path, "seek"):
+                file_path.seek(0)
+
+    from dataloader import DataLoader
+    from report import ReportGenerator
+
+    data = DataLoader(file_path, start_day, number_of_days, cache=cache, engine=engine, seek=seek).load_data()
+    return ReportGenerator(data).compile_grid(start_day, number_of_days)
+
+
+def compile_report_stdlib(file_path: Union[str, IO[bytes]], start_day: Optional[str] = None,
+                          number_of_days: int = 6) -> Dict[date, Dict[str, list]]:
+    with stage("load.stdlib") as load_stage:
+        rows = _read_rows(file_path)
+        load_stage.rows = len(rows["Date"])
+
+        starts = _parse_start_times(rows["Date"])
+        distances = _parse_numbers(rows["Distance"])
+        paces = rows["Avg Pace"] if "Avg Pace" in rows else [_pace_from_speed(value) for value in rows["Avg Speed"]]
+        last_day = first_day = None
+        if start_day is not None:
+            last_day = _parse_day(start_day)
+            first_day = last_day - timedelta(days=number_of_days)
+
+        # sorting on the day alone is stable, so runs keep their export order inside each day
+        selected = [
+            index for index, start in enumerate(starts)
+            if start is not None and (last_day is None or first_day <= start.date() <= last_day)
+        ]
+        selected.sort(key=lambda index: starts[index].date())
+
+    with stage("report.compile", len(selected)):
+        report: Dict[date, Dict[str, list]] = {}
+        for index in selected:
+            start = starts[index]
+            day = report.setdefault(start.date(), {"morning": [], "afternoon": []})
+            day["morning" if start.hour < 12 else "afternoon"].append({
+                "Time": rows["Time"][index],
+                "Distance": distances[index],
+                "Pace": paces[index],
+            })
+        return report
+
+
+def _read_rows(file_path: Union[str, IO[bytes]]) -> Dict[str, list]:
+    if hasattr(file_path, "read"):
+        text = io.TextIOWrapper(file_path, encoding="utf-8-sig", newline="")
+    else:
+        text = open(file_path, encoding="utf-8-sig", newline="")
+    try:
+        reader = csv.reader(text)
+        header = next(reader, [])
+        columns = detect_schema(header).columns
+        positions = {name: header.index(variant) for variant, name in columns.items()}
+        rows: Dict[str, list] = {name: [] for name in columns.values()}
+        for record in reader:
+            if not record:
+                continue
+            for name, position in positions.items():
+                value = record[position] if position < len(record) else ""
+                rows[name].append(math.nan if value in NA_VALUES else value)
+        return rows
+    finally:
+        # leave caller-owned file objects open
+        if hasattr(file_path, "read"):
+            text.detach()
+        else:
+            text.close()
+
+
+def _parse_start_times(values: list) -> List[Optional[datetime]]:
+    # the format is picked from a sample like the pandas engine does; anything it would have
+    # to guess per row is left to pandas
+    sample = [value for value in values if isinstance(value, str)][:DATE_FORMAT_SAMPLE_SIZE]
+    for date_format in DATE_FORMATS:
+        if all(_strptime(value, date_format) for value in sample):
+            starts = [_strptime(value, date_format) if isinstance(value, str) else None for value in values]
+            # rows further down in another known format are kept, anything else goes to pandas
+            for index, start in enumerate(starts):
+                if start is None and isinstance(values[index], str):
+                    starts[index] = next(filter(None, (_strptime(values[index], other) for other in DATE_FORMATS)), None)
+                    if starts[index] is None:
+                        raise UnsupportedExport(f"unrecognised start time {values[index]!r}")
+            return starts
+    raise UnsupportedExport("unrecognised start time format")
+
+
+def _strptime(value: str, date_format: str) -> Optional[datetime]:
+    try:
+        return datetime.strptime(value, date_format)
+    except ValueError:
+        return None
+
+
+def _parse_numbers(values: list) -> list:
+    # ints when every value is a whole number, floats otherwise, as pandas infers the column
+    try:
+        if all(isinstance(value, str) and value.lstrip("+-").isdigit() for value in values):
+            return [int(value) for value in values]
+        return [value if isinstance(value, float) else float(value) for value in values]
+    except ValueError:
+        raise UnsupportedExport("non-numeric distances")
+
+
+def _pace_from_speed(value) -> str:
+    # durations.pace_from_speed for one value: empty when there is no usable speed
+    try:
+        speed = float(value.replace(",", ".")) if isinstance(value, str) else float(value)
+    except ValueError:
+        return ""
+    if not speed > 0:
+        return ""
+    seconds = round(3600 / speed)
+    return f"{seconds // 60}:{seconds % 60:02d}"
+
+
+def _parse_day(value: str) -> date:
+    for date_format in ["%Y-%m-%d", "%Y/%m/%d", *DATE_FORMATS]:
+        parsed = _strptime(value, date_format)
+        if parsed is not None:
+            return parsed.date()
+    raise UnsupportedExport(f"unrecognised start day {value!r}")
@@ -0,0 +1,130 @@
+import csv
+import html
+import io
+import json
+from abc import ABC, abstractmethod
+from datetime import date
+from typing import IO, Dict, List, Union
+
+from context import DAYS_OF_WEEK, Report, prepare_context
+from instrumentation import stage
+
+# docxtpl-free renderers for consumers that only want the numbers; TemplateRenderer stays the archival .docx path
+FORMATS = ["docx", "json", "csv", "html"]
+PERIODS = {"morning": "MORN", "afternoon": "AFTER"}
+PERIOD_LABELS = {"morning": "Manhã", "afternoon": "Tarde"}
+WEEKDAY_PREFIXES = ("DATE_", "TIME_", "DIST_", "PACE_")
+
+HTML_STYLE = (
+    "body{font-family:Calibri,Arial,sans-serif;margin:2em}"
+    "table{border-collapse:collapse}"
+    "th,td{border:1px solid #999;padding:4px 10px;text-align:left}"
+    "th{background:#eee}"
+    "tfoot td{font-weight:bold}"
+)
+
+
+def weekly_days(context: Dict[str, str]) -> List[Dict[str, object]]:
+    # the flat template context regrouped per day and period; the template's columns are slots
+    # filled from the window's first day on, so each day is named after its own date
+    return [
+        {
+            "day": DAYS_OF_WEEK[date.fromisoformat(context[f"DATE_{day}"]).weekday()],
+            "date": context[f"DATE_{day}"],
+            **{
+                period: {
+                    "time": context[f"TIME_{day}_{suffix}"],
+                    "distance": context[f"DIST_{day}_{suffix}"],
+                    "pace": context[f"PACE_{day}_{suffix}"],
+                }
+                for period, suffix in PERIODS.items()
+            },
+        }
+        for day in DAYS_OF_WEEK
+    ]
+
+
+class ContextRenderer(ABC):
+    extension = ""
+    mime = ""
+
+    def render_report(self, report: Report, output_path: Union[str, IO[bytes]]) -> None:
+        content = self.render_bytes(report)
+        if isinstance(output_path, str):
+            with open(output_path, "wb") as f:
+                f.write(content)
+        else:
+            output_path.write(content)
+
+    def render_bytes(self, report: Report) -> bytes:
+        context = prepare_context(report)
+        with stage(f"render.{self.extension}"):
+            return self.render(context)
+
+    @abstractmethod
+    def render(self, context: Dict[str, str]) -> bytes:
+        pass
+
+
+class JsonRenderer(ContextRenderer):
+    extension = "json"
+    mime = "application/json"
+
+    def render(self, context: Dict[str, str]) -> bytes:
+        # the WEEKLY_ fields and anything added beyond the week (training load) lower-cased
+        totals = {name.lower(): value for name, value in context.items() if not name.startswith(WEEKDAY_PREFIXES)}
+        content = {"days": weekly_days(context), **totals}
+        return json.dumps(content, ensure_ascii=False).encode("utf-8")
+
+
+class CsvRenderer(ContextRenderer):
+    extension = "csv"
+    mime = "text/csv"
+
+    def render(self, context: Dict[str, str]) -> bytes:
+        output = io.StringIO()
+        writer = csv.writer(output)
+        writer.writerow(["day", "date", "period", "time", "distance", "pace"])
+        for day in weekly_days(context):
+            for period in PERIODS:
+                runs = day[period]
+                writer.writerow([day["day"], day["date"], period, runs["time"], runs["distance"], runs["pace"]])
+        return output.getvalue().encode("utf-8")
+
+
+class HtmlRenderer(ContextRenderer):
+    # a standalone page laid out like the .docx table
+    extension = "html"
+    mime = "text/html"
+
+    def render(self, context: Dict[str, str]) -> bytes:
+        rows = []
+        for day in weekly_days(context):
+            for i, period in enumerate(PERIODS):
+                runs = day[period]
+                date_cell = f'<td rowspan="2">{html.escape(day["date"])}</td>' if i == 0 else ""
+                rows.append(
+                    f"<tr>{date_cell}<td>{PERIOD_LABELS[period]}</td><td>{html.escape(runs['time'])}</td>"
+                    f"<td>{html.escape(runs['distance'])}</td><td>{html.escape(runs['pace'])}</td></tr>"
+                )
+        return (
+            '<!DOCTYPE html><html lang="pt"><head><meta charset="utf-8"><title>Registo de Treino</title>'
+            f"<style>{HTML_STYLE}</style></head><body><h1>Registo de Treino</h1><table>"
+            "<thead><tr><th>Data</th><th></th><th>Tempo</th><th>Total kms</th><th>Ritmo (min./km)</th></tr></thead>"
+            f"<tbody>{''.join(rows)}</tbody>"
+            f'<tfoot><tr><td colspan="3">Distância semanal</td><td colspan="2">{html.escape(context["WEEKLY_DISTANCE"])} km</td></tr></tfoot>'
+            "</table></body></html>"
+        ).encode("utf-8")
+
+
+RENDERERS = {"json": JsonRenderer, "csv": CsvRenderer, "html": HtmlRenderer}
+
+
+def get_renderer(output_format: str, template_path: str):
+    # docxtpl is only imported for .docx output
+    if output_format == "docx":
+        from renderer import TemplateRenderer
+        return TemplateRenderer(template_path)
+    if output_format not in RENDERERS:
+        raise ValueError(f"unknown format {output_format!r}, expected one of {', '.join(FORMATS)}")
+    return RENDERERS[output_format]()
@@ -0,0 +1,100 @@
+import argparse
+import io
+import os
+import sys
+from datetime import date, datetime, timedelta
+from typing import List, Optional
+
+from engines import ENGINES, choose_engine, compile_grid
+from formats import FORMATS, get_renderer
+
+# pandas and docxtpl are only imported once the arguments are valid, so --help and
+# argument errors return without paying for them; small exports never import pandas at all
+
+START_DAY_FORMATS = ["%Y-%m-%d", "%Y/%m/%d"]
+DEFAULT_TEMPLATE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "data", "log_template.docx")
+
+
+def last_sunday(today: Optional[date] = None) -> date:
+    today = today or date.today()
+    return today - timedelta(days=(today.weekday() + 1) % 7)
+
+
+def start_day_argument(value: str) -> str:
+    for date_format in START_DAY_FORMATS:
+        try:
+            return datetime.strptime(value, date_format).strftime("%Y-%m-%d")
+        except ValueError:
+            continue
+    raise argparse.ArgumentTypeError(f"expected a date like 2024-03-10, got {value!r}")
+
+
+def positive_int(value: str) -> int:
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"expected a positive number of days, got {value!r}")
+    return number
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Generate a weekly training log from a Garmin activities export")
+    parser.add_argument("input", help="activities export (.csv), a folder of GPX/TCX tracks, or - to read an export from stdin")
+    parser.add_argument("--start-day", type=start_day_argument, default=None,
+                        help="last day of the log, e.g. 2024-03-10 (default: last Sunday)")
+    parser.add_argument("--days", type=positive_int, default=6, help="days before the start day to include")
+    parser.add_argument("--name", default="Diogo")
+    parser.add_argument("--output", default=None,
+                        help="where to write the log, or - for stdout (default: ./Registo_Treino <name>.<format>)")
+    parser.add_argument("--format", choices=FORMATS, default="docx",
+                        help="docx for the archival document, json, csv or html for quick previews and other programs")
+    parser.add_argument("--template", default=DEFAULT_TEMPLATE)
+    parser.add_argument("--no-cache", action="store_true", help="always re-parse the export")
+    parser.add_argument("--engine", choices=ENGINES, default="auto",
+                        help="CSV parser; auto uses the stdlib reader for small exports and pyarrow for huge ones")
+    parser.add_argument("--sorted", action="store_true",
+                        help="the export is in date order: read only the window's lines (pandas and pyarrow engines)")
+    parser.add_argument("--training-load", action="store_true",
+                        help="also fill the ACUTE_DISTANCE, CHRONIC_DISTANCE and ACWR fields from the last 28 days")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.input != "-" and not os.path.exists(args.input):
+        parser.error(f"no such export: {args.input}")
+    if args.format == "docx" and not os.path.isfile(args.template):
+        parser.error(f"no such template: {args.template}")
+
+    start_day = args.start_day or last_sunday().strftime("%Y-%m-%d")
+    export = io.BytesIO(sys.stdin.buffer.read()) if args.input == "-" else args.input
+    engine = choose_engine(export, args.engine)
+    cache = None
+    if engine != "stdlib" and not args.no_cache:
+        from cache import ParsedExportCache
+        cache = ParsedExportCache()
+    report = compile_grid(export, start_day, args.days, engine, cache, args.sorted)
+    if args.training_load:
+        from analytics import load_fields
+
+        if hasattr(export, "seek"):
+            export.seek(0)
+        report.fields.update(load_fields(export, start_day, cache))
+
+    renderer = get_renderer(args.format, args.template)
+    if args.output == "-":
+        sys.stdout.buffer.write(renderer.render_bytes(report))
+        sys.stdout.buffer.flush()
+    else:
+        output_path = args.output or f"./Registo_Treino {args.name}.{renderer.extension}"
+        renderer.render_report(report, output_path)
+        # stdout may be the document itself, so progress goes to stderr
+        print(f"Report generated at {output_path}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,184 @@
+import atexit
+import cProfile
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+from typing import Dict, List, NamedTuple, Optional
+
+logger = logging.getLogger("training_log_generator")
+
+# e.g. TRAINING_LOG_INSTRUMENT="log,memory,profile=pipeline.prof"
+ENVIRONMENT_VARIABLE = "TRAINING_LOG_INSTRUMENT"
+
+
+class StageRecord(NamedTuple):
+    name: str
+    seconds: float
+    rows: Optional[int]
+    peak_bytes: Optional[int]
+
+
+class Sink:
+    def start(self, name: str, depth: int) -> None:
+        pass
+
+    def record(self, record: StageRecord, depth: int) -> None:
+        pass
+
+
+class LogSink(Sink):
+    # one JSON object per stage, so the log can be parsed back
+    def __init__(self, log: logging.Logger = logger, level: int = logging.INFO):
+        self.log = log
+        self.level = level
+
+    def record(self, record: StageRecord, depth: int) -> None:
+        if self.log.isEnabledFor(self.level):
+            self.log.log(self.level, json.dumps({**record._asdict(), "depth": depth}))
+
+
+class MetricsSink(Sink):
+    def __init__(self):
+        self.metrics: Dict[str, Dict[str, float]] = {}
+        self.lock = threading.Lock()
+
+    def record(self, record: StageRecord, depth: int) -> None:
+        with self.lock:
+            stage = self.metrics.setdefault(record.name, {"count": 0, "seconds": 0.0, "max_seconds": 0.0, "rows": 0, "peak_bytes": 0})
+            stage["count"] += 1
+            stage["seconds"] += record.seconds
+            stage["max_seconds"] = max(stage["max_seconds"], record.seconds)
+            stage["rows"] += record.rows or 0
+            stage["peak_bytes"] = max(stage["peak_bytes"], record.peak_bytes or 0)
+
+
+class ProfileSink(Sink):
+    # profiles everything under the outermost stages, written out with dump()
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.profile = cProfile.Profile()
+
+    def start(self, name: str, depth: int) -> None:
+        if depth == 0:
+            self.profile.enable()
+
+    def record(self, record: StageRecord, depth: int) -> None:
+        if depth == 0:
+            self.profile.disable()
+
+    def dump(self, path: Optional[str] = None) -> None:
+        self.profile.dump_stats(path or self.path)
+
+
+class Stage:
+    __slots__ = ("instrumentation", "name", "rows", "started", "start_memory", "peak_memory", "depth")
+
+    def __init__(self, instrumentation: "Instrumentation", name: str, rows: Optional[int]):
+        self.instrumentation = instrumentation
+        self.name = name
+        self.rows = rows
+
+    def __enter__(self) -> "Stage":
+        self.instrumentation.enter(self)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.instrumentation.exit(self)
+
+
+class NullStage:
+    # shared by every stage while instrumentation is off, so a disabled stage costs one call
+    __slots__ = ("rows",)
+
+    def __enter__(self) -> "NullStage":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        pass
+
+
+NULL_STAGE = NullStage()
+
+
+class Instrumentation:
+    def __init__(self, sinks: Optional[List[Sink]] = None, trace_memory: bool = False):
+        self.sinks = sinks or []
+        self.trace_memory = trace_memory
+        self.local = threading.local()
+
+    def stage(self, name: str, rows: Optional[int] = None):
+        if not self.sinks:
+            return NULL_STAGE
+        return Stage(self, name, rows)
+
+    def enter(self, stage: Stage) -> None:
+        stack = self.__stack()
+        stage.depth = len(stack)
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            current, peak = tracemalloc.get_traced_memory()
+            # the peak counter is shared, so hand what the enclosing stage has seen so far back to it first
+            if stack:
+                stack[-1].peak_memory = max(stack[-1].peak_memory, peak)
+            tracemalloc.reset_peak()
+            stage.start_memory = stage.peak_memory = current
+        stack.append(stage)
+        for sink in self.sinks:
+            sink.start(stage.name, stage.depth)
+        stage.started = time.perf_counter()
+
+    def exit(self, stage: Stage) -> None:
+        seconds = time.perf_counter() - stage.started
+        stack = self.__stack()
+        stack.pop()
+        peak_bytes = None
+        if self.trace_memory:
+            stage.peak_memory = max(stage.peak_memory, tracemalloc.get_traced_memory()[1])
+            peak_bytes = stage.peak_memory - stage.start_memory
+            if stack:
+                stack[-1].peak_memory = max(stack[-1].peak_memory, stage.peak_memory)
+        record = StageRecord(stage.name, seconds, stage.rows, peak_bytes)
+        for sink in self.sinks:
+            sink.record(record, stage.depth)
+
+    def __stack(self) -> List[Stage]:
+        if not hasattr(self.local, "stack"):
+            self.local.stack = []
+        return self.local.stack
+
+    @classmethod
+    def from_environment(cls) -> "Instrumentation":
+        sinks: List[Sink] = []
+        trace_memory = False
+        for option in filter(None, os.environ.get(ENVIRONMENT_VARIABLE, "").split(",")):
+            name, _, value = option.strip().partition("=")
+            if name == "log":
+                logging.basicConfig(level=logging.INFO)
+                sinks.append(LogSink())
+            elif name == "memory":
+                trace_memory = True
+            elif name == "profile":
+                profile = ProfileSink(value or f"training_log_{os.getpid()}.prof")
+                atexit.register(profile.dump)
+                sinks.append(profile)
+        return cls(sinks, trace_memory)
+
+
+_instrumentation = Instrumentation.from_environment()
+
+
+def get_instrumentation() -> Instrumentation:
+    return _instrumentation
+
+
+def set_instrumentation(instrumentation: Instrumentation) -> None:
+    global _instrumentation
+    _instrumentation = instrumentation
+
+
+def stage(name: str, rows: Optional[int] = None):
+    return _instrumentation.stage(name, rows)
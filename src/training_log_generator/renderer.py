@@ -1,94 +1,166 @@
-from typing import Dict
+import io
+import re
+from typing import IO, Dict, Optional, Union
 from docxtpl import DocxTemplate # type: ignore[import]
-from datetime import timedelta
+from datetime import date
+
+from compiled_template import CompiledTemplate
+from context import DAYS_OF_WEEK, Report, as_grid, prepare_context
+from docx_package import TemplatePackage
+from instrumentation import stage
+
+# parts docxtpl renders besides the main document
+RENDERED_CONTENT_TYPES = {
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.header+xml",
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.footer+xml",
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.footnotes+xml",
+    "application/vnd.openxmlformats-package.core-properties+xml",
+}
+CORE_PROPERTIES_CONTENT_TYPE = "application/vnd.openxmlformats-package.core-properties+xml"
+
+PLACEHOLDER = re.compile(r"\{\{\s*([A-Z_]+)\s*\}\}")
+TABLE_START = re.compile(r"<w:tbl[ >]")
+
+# paragraphs wrapped around the weekly table in the season document, {%p %} tags replace their whole paragraph
+SEASON_WEEK_START = (
+    '<w:p><w:r><w:t>{%p for week in weeks %}</w:t></w:r></w:p>'
+    '<w:p><w:pPr><w:spacing w:after="120"/></w:pPr><w:r><w:rPr><w:b/></w:rPr>'
+    '<w:t xml:space="preserve">Semana {{ week.WEEK }}</w:t></w:r></w:p>'
+)
+SEASON_WEEK_END = (
+    '<w:p><w:r><w:t xml:space="preserve">Distância acumulada: {{ week.CUMULATIVE_DISTANCE }} km</w:t></w:r></w:p>'
+    '<w:p><w:r><w:t>{%p if not loop.last %}</w:t></w:r></w:p>'
+    '<w:p><w:r><w:br w:type="page"/></w:r></w:p>'
+    '<w:p><w:r><w:t>{%p endif %}</w:t></w:r></w:p>'
+    '<w:p><w:r><w:t>{%p endfor %}</w:t></w:r></w:p>'
+)
 
 class TemplateRenderer:
-    def __init__(self, template_path: str):
+    extension = "docx"
+    mime = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+    def __init__(self, template_path: str, passthrough: bool = True, compiled: bool = True):
         self.template_path = template_path
+        self.template_bytes: Optional[bytes] = None
+        # when set, unchanged template parts are copied into the output without recompressing them
+        self.passthrough = passthrough
+        # when set, templates made only of {{ NAME }} placeholders skip docxtpl entirely
+        self.compiled = compiled
+        self.compiled_template: Optional[CompiledTemplate] = None
+        self.compile_checked = False
+        self.package: Optional[TemplatePackage] = None
+        self.season_template_bytes: Optional[bytes] = None
+        self.template_relationships: Optional[int] = None
+
+    def load_template(self) -> bytes:
+        # the template is read from disk once and every render works on the in-memory copy
+        if self.template_bytes is None:
+            with open(self.template_path, "rb") as f:
+                self.template_bytes = f.read()
+        return self.template_bytes
+
+    def load_package(self) -> TemplatePackage:
+        if self.package is None:
+            self.package = TemplatePackage(self.load_template())
+        return self.package
+
+    def render_report(self, report: Report, output_path: Union[str, IO[bytes]]) -> None:
+        context = self.prepare_context(report)
+        compiled_template = self.load_compiled_template()
+        if compiled_template is not None:
+            with stage("render.compiled"):
+                rendered = compiled_template.render(context)
+            with stage("render.save"):
+                self.load_package().write(output_path, rendered)
+            return
+        doc = self.render_context(context)
+        self.save_document(doc, output_path)
+
+    def load_compiled_template(self) -> Optional[CompiledTemplate]:
+        # analysed once; None when compiled mode is off or the template needs Jinja
+        if self.compiled and not self.compile_checked:
+            self.compiled_template = CompiledTemplate.compile(self.load_package())
+            self.compile_checked = True
+        return self.compiled_template
+
+    def render_bytes(self, report: Report) -> bytes:
+        output = io.BytesIO()
+        self.render_report(report, output)
+        return output.getvalue()
 
-    def render_report(self, report: Dict[str, Dict[str, list]], output_path: str) -> DocxTemplate:
-        doc = DocxTemplate(self.template_path)
-        context = self.__prepare_context(report)
-        doc.render(context)
-        doc.save(output_path)
-        # return doc
-
-    def __prepare_context(self, data: Dict[str, Dict[str, list]]) -> Dict[str, str]:
-        context = {}
-        days_of_week = [
-            "MONDAY",
-            "TUESDAY",
-            "WEDNESDAY",
-            "THURSDAY",
-            "FRIDAY",
-            "SATURDAY",
-            "SUNDAY",
-        ]
-        try:
-            start_date = list(data.keys())[0]
-        except Exception:
+    def render_context(self, context: Dict[str, object], template_bytes: Optional[bytes] = None) -> DocxTemplate:
+        with stage("render.docx"):
+            doc = DocxTemplate(io.BytesIO(template_bytes or self.load_template()))
+            doc.init_docx()
+            if self.template_relationships is None:
+                self.template_relationships = len(doc.docx.part.rels)
+            doc.render(context)
+        return doc
+
+    def save_document(self, doc: DocxTemplate, output_path: Union[str, IO[bytes]]) -> None:
+        with stage("render.save"):
+            rendered = self.__rendered_parts(doc) if self.passthrough else None
+            if rendered is None:
+                doc.save(output_path)
+            else:
+                self.load_package().write(output_path, rendered)
+
+    def render_season(self, weeks: Dict[date, Report], output_path: Union[str, IO[bytes]]) -> None:
+        # weeks maps each week's monday to that week's report (see ReportGrid.weeks), in the order they should appear
+        if not weeks:
             raise Exception("No data found for the selected date range")
-        total_distance = 0.0
-
-        for i, day in enumerate(days_of_week):
-            current_date = start_date + timedelta(days=i)
-            date_str = current_date.strftime("%Y-%m-%d")
-
-            morning_data = data.get(current_date, {}).get("morning", [])
-            afternoon_data = data.get(current_date, {}).get("afternoon", [])
-
-            # when there are more than one run in a morning or afternoon (workouts with warm up, main workout, cool down)
-            # the order of the activities would should in the incorrect order so we reverse the list to show the correct order
-            if len(morning_data) > 1:
-                morning_data = morning_data[::-1]
-
-            if len(afternoon_data) > 1:
-                afternoon_data = afternoon_data[::-1]
-
-            morning_time = (
-                ", ".join([item["Time"] for item in morning_data]) if morning_data else ""
-            )
-            morning_dist = (
-                ", ".join([str(item["Distance"]) for item in morning_data])
-                if morning_data
-                else ""
-            )
-            morning_pace = (
-                ", ".join([item["Pace"] for item in morning_data]) if morning_data else ""
-            )
-
-            afternoon_time = (
-                ", ".join([item["Time"] for item in afternoon_data])
-                if afternoon_data
-                else ""
-            )
-            afternoon_dist = (
-                ", ".join([str(item["Distance"]) for item in afternoon_data])
-                if afternoon_data
-                else ""
-            )
-            afternoon_pace = (
-                ", ".join([item["Pace"] for item in afternoon_data])
-                if afternoon_data
-                else ""
-            )
-
-            context[f"DATE_{day}"] = date_str
-            context[f"TIME_{day}_MORN"] = morning_time
-            context[f"DIST_{day}_MORN"] = morning_dist
-            context[f"PACE_{day}_MORN"] = morning_pace
-            context[f"TIME_{day}_AFTER"] = afternoon_time
-            context[f"DIST_{day}_AFTER"] = afternoon_dist
-            context[f"PACE_{day}_AFTER"] = afternoon_pace
-
-            print(
-                f"{day}: Date: {date_str}, Morning: {morning_time}, {morning_dist}, {morning_pace}, Afternoon: {afternoon_time}, {afternoon_dist}, {afternoon_pace}"
-            )  # Debug statement
-
-            total_distance += sum(
-                float(item["Distance"]) for item in morning_data + afternoon_data
-            )
-
-        context["WEEKLY_DISTANCE"] = str(round(total_distance, 2))
-        # print(f"Weekly Total Distance: {total_distance}")  # Debug statement
-        return context
+
+        week_contexts = []
+        cumulative_distance = 0.0
+        for monday, report in weeks.items():
+            grid = as_grid(report, monday)
+            context = prepare_context(grid)
+            cumulative_distance += round(grid.total_distance(0, len(DAYS_OF_WEEK)), 2)
+            iso_year, iso_week, _ = monday.isocalendar()
+            context["WEEK"] = f"{iso_year}-W{iso_week:02d}"
+            context["CUMULATIVE_DISTANCE"] = str(round(cumulative_distance, 2))
+            week_contexts.append(context)
+
+        doc = self.render_context({"weeks": week_contexts}, self.__load_season_template())
+        self.save_document(doc, output_path)
+
+    def __load_season_template(self) -> bytes:
+        # the weekly table of the template is repeated once per week, with its placeholders read from the loop variable
+        if self.season_template_bytes is None:
+            document = self.load_package().read("word/document.xml").decode("utf-8")
+            body_start = document.index("<w:body>") + len("<w:body>")
+            body_end = document.rindex("<w:sectPr", body_start)
+            table = TABLE_START.search(document, body_start, body_end)
+            start = table.start() if table else body_start
+            end = document.rindex("</w:tbl>", start, body_end) + len("</w:tbl>") if table else body_end
+
+            section = PLACEHOLDER.sub(r"{{ week.\1 }}", document[start:end])
+            document = document[:start] + SEASON_WEEK_START + section + SEASON_WEEK_END + document[end:]
+
+            output = io.BytesIO()
+            self.load_package().write(output, {"word/document.xml": document.encode("utf-8")})
+            self.season_template_bytes = output.getvalue()
+        return self.season_template_bytes
+
+    def __rendered_parts(self, doc: DocxTemplate) -> Optional[Dict[str, bytes]]:
+        # new relationships (links, images, sub documents) mean the package itself changed,
+        # in which case python-docx has to write the whole thing
+        if len(doc.docx.part.rels) != self.template_relationships:
+            return None
+
+        package = self.load_package()
+        main_part = doc.docx.part
+        rendered = {}
+        for part in main_part.package.iter_parts():
+            name = part.partname[1:]
+            if name not in package.names:
+                # python-docx creates core properties on the fly when the template has none
+                if part.content_type == CORE_PROPERTIES_CONTENT_TYPE:
+                    continue
+                return None
+            if part is main_part or part.content_type in RENDERED_CONTENT_TYPES:
+                rendered[name] = part.blob
+        return rendered
+
+    def prepare_context(self, data: Report, start_date: Optional[date] = None) -> Dict[str, str]:
+        return prepare_context(data, start_date)
@@ -1,15 +1,107 @@
 import pandas as pd
-from typing import Dict
+from datetime import timedelta
+from typing import Dict, Optional
+
+from durations import format_durations, parse_durations
+from instrumentation import stage
+from report_grid import PERIODS, ReportGrid, Run
 
 class ReportGenerator:
     def __init__(self, data: pd.DataFrame):
         self.data = data
 
-    def compile_report(self) -> Dict[str, Dict[str, list]]:
+    def compile_report(self, vectorized: bool = True) -> Dict[str, Dict[str, list]]:
+        with stage("report.compile", len(self.data)):
+            if not vectorized:
+                return self.__compile_report_grouped()
+            return self.__compile_report_columnar()
+
+    def __compile_report_columnar(self) -> Dict[str, Dict[str, list]]:
+        # groupby drops rows with a missing key, so do the same here
+        data = self.data[self.data["Date"].notna() & self.data["am_pm"].notna()]
+
+        # a stable sort on the date codes keeps the original run order inside each day,
+        # exactly like the groups produced by groupby
+        codes, unique_dates = pd.factorize(data["Date"], sort=True)
+        order = codes.argsort(kind="stable")
+        # report keys are plain dates, only the unique days need converting
+        if isinstance(unique_dates, pd.DatetimeIndex):
+            unique_dates = pd.Index(unique_dates.date)
+        dates = unique_dates.take(codes[order]).tolist()
+        periods = data["am_pm"].to_numpy()[order].tolist()
+        times = self.__as_text(data["Time"], True).to_numpy()[order].tolist()
+        distances = self.__as_float(data["Distance"]).to_numpy()[order].tolist()
+        paces = self.__as_text(data["Avg Pace"], False).to_numpy()[order].tolist()
+
+        report = {}
+        for date, am_pm, time, distance, pace in zip(dates, periods, times, distances, paces):
+            if date not in report:
+                report[date] = {"morning": [], "afternoon": []}
+            report[date][am_pm].append({"Time": time, "Distance": distance, "Pace": pace})
+
+        return report
+
+    @staticmethod
+    def __as_text(column: pd.Series, with_hours: bool) -> pd.Series:
+        # compact frames hold durations as whole seconds, the report shows them as text;
+        # a missing one (e.g. a pace from a missing speed) is shown empty
+        if pd.api.types.is_integer_dtype(column):
+            return format_durations(column, with_hours).fillna("")
+        return column
+
+    @staticmethod
+    def __as_float(column: pd.Series) -> pd.Series:
+        # the shortest float32 repr is the value as written in the export (15.64, not 15.640000343)
+        if column.dtype == "float32":
+            return column.astype(str).astype(float)
+        return column
+
+    def compile_grid(self, start_day: Optional[str] = None, number_of_days: int = 6) -> ReportGrid:
+        # the same window as DataLoader: number_of_days before start_day up to start_day,
+        # or every day with runs when there is no start day
+        with stage("report.grid", len(self.data)):
+            data = self.data[self.data["Date"].notna() & self.data["am_pm"].notna()]
+            if start_day is not None:
+                first_day = pd.to_datetime(start_day).normalize() - timedelta(days=number_of_days)
+                days = number_of_days + 1
+            elif len(data):
+                first_day = data["Date"].min()
+                days = (data["Date"].max() - first_day).days + 1
+            else:
+                raise Exception("No data found for the selected date range")
+
+            offsets = ((data["Date"] - first_day) // timedelta(days=1)).to_numpy()
+            inside = (offsets >= 0) & (offsets < days)
+            data = data[inside]
+            if data.empty:
+                # nothing to parse: an empty window has no duration columns to split
+                return ReportGrid(first_day.date(), days)
+            cell_index = (offsets[inside] * len(PERIODS) + (data["am_pm"] == PERIODS[1]).to_numpy()).tolist()
+
+            distances = self.__as_float(data["Distance"]).tolist()
+            seconds = self.__as_seconds(data["Time"])
+            pace_seconds = self.__as_seconds(data["Avg Pace"])
+            times = self.__as_text(data["Time"], True).tolist()
+            paces = self.__as_text(data["Avg Pace"], False).tolist()
+
+            grid = ReportGrid(first_day.date(), days)
+            # walking the export backwards leaves every cell in display order
+            for i in range(len(cell_index) - 1, -1, -1):
+                grid.cells[cell_index[i]].append(Run(distances[i], seconds[i], pace_seconds[i], times[i], paces[i]))
+            return grid
+
+    @staticmethod
+    def __as_seconds(column: pd.Series) -> list:
+        seconds = column.astype(float) if pd.api.types.is_integer_dtype(column) else parse_durations(column)
+        return seconds.astype(object).where(seconds.notna(), None).tolist()
+
+    def __compile_report_grouped(self) -> Dict[str, Dict[str, list]]:
         report = {}
         grouped = self.data.groupby(["Date", "am_pm"])
 
         for (date, am_pm), group_df in grouped:
+            if isinstance(date, pd.Timestamp):
+                date = date.date()
             if date not in report:
                 report[date] = {"morning": [], "afternoon": []}
 
@@ -0,0 +1,152 @@
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+
+# pandas-free on purpose, the stdlib engine builds grids too
+
+PERIODS = ("morning", "afternoon")
+
+
+class Run:
+    # distance and durations as numbers for totals, the export's own text for display
+    __slots__ = ("distance", "seconds", "pace_seconds", "time", "pace")
+
+    def __init__(self, distance: float, seconds: Optional[float], pace_seconds: Optional[float], time: str, pace: str):
+        self.distance = distance
+        self.seconds = seconds
+        self.pace_seconds = pace_seconds
+        self.time = time
+        self.pace = pace
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, Run) and all(getattr(self, name) == getattr(other, name) for name in Run.__slots__)
+
+    def __reduce__(self):
+        # positional state pickles much smaller than the default slot dict
+        return Run, (self.distance, self.seconds, self.pace_seconds, self.time, self.pace)
+
+    def __repr__(self) -> str:
+        return f"Run({self.distance}, {self.time!r}, {self.pace!r})"
+
+
+class ReportGrid:
+    # one cell per day offset and period, cells hold their runs in display order
+    # (the reverse of a Garmin export's newest-first order, so warm ups come first)
+    __slots__ = ("first_day", "days", "cells", "fields")
+
+    def __init__(self, first_day: date, days: int, cells: Optional[List[List[Run]]] = None,
+                 fields: Optional[Dict[str, str]] = None):
+        self.first_day = first_day
+        self.days = days
+        self.cells = cells if cells is not None else [[] for _ in range(days * len(PERIODS))]
+        # template fields worked out beyond these days, e.g. analytics.TrainingLoad.fields;
+        # they describe this grid as a whole, so windows and weeks do not inherit them
+        self.fields = fields if fields is not None else {}
+
+    def day(self, offset: int) -> date:
+        return self.first_day + timedelta(days=offset)
+
+    def runs(self, offset: int, period: int) -> List[Run]:
+        if not 0 <= offset < self.days:
+            return []
+        return self.cells[offset * len(PERIODS) + period]
+
+    def add(self, offset: int, period: int, run: Run) -> None:
+        self.cells[offset * len(PERIODS) + period].append(run)
+
+    def total_distance(self, start: int = 0, stop: Optional[int] = None) -> float:
+        stop = self.days if stop is None else min(stop, self.days)
+        total = 0.0
+        # summed day by day, so weekly totals round exactly like they always have
+        for offset in range(start, stop):
+            total += sum(run.distance for period in range(len(PERIODS)) for run in self.runs(offset, period))
+        return total
+
+    def total_seconds(self, start: int = 0, stop: Optional[int] = None) -> float:
+        cells = self.cells[start * len(PERIODS):None if stop is None else stop * len(PERIODS)]
+        return sum(run.seconds for runs in cells for run in runs if run.seconds is not None)
+
+    def weighted_pace(self, start: int = 0, stop: Optional[int] = None) -> Optional[float]:
+        # seconds per km, each pace weighted by its run's distance; None without any paced distance
+        cells = self.cells[start * len(PERIODS):None if stop is None else stop * len(PERIODS)]
+        paced = [(run.pace_seconds, run.distance) for runs in cells for run in runs
+                 if run.pace_seconds is not None and run.distance > 0]
+        distance = sum(distance for _, distance in paced)
+        return sum(pace * distance for pace, distance in paced) / distance if distance > 0 else None
+
+    def run_count(self) -> int:
+        return sum(len(runs) for runs in self.cells)
+
+    def window(self, first_day: date, days: int) -> "ReportGrid":
+        # a view over other days, sharing the run records; days outside this grid are empty
+        grid = ReportGrid(first_day, days)
+        shift = (first_day - self.first_day).days
+        for offset in range(days):
+            for period in range(len(PERIODS)):
+                grid.cells[offset * len(PERIODS) + period] = list(self.runs(offset + shift, period))
+        return grid
+
+    def weeks(self) -> Dict[date, "ReportGrid"]:
+        # monday to sunday grids covering every day of this one
+        monday = self.first_day - timedelta(days=self.first_day.weekday())
+        last_day = self.day(self.days - 1)
+        weeks = {}
+        while monday <= last_day:
+            weeks[monday] = self.window(monday, 7)
+            monday += timedelta(days=7)
+        return weeks
+
+    def __reduce__(self):
+        return ReportGrid, (self.first_day, self.days, self.cells, self.fields)
+
+    def to_report(self) -> Dict[date, Dict[str, list]]:
+        # the nested dict shape of ReportGenerator.compile_report, in export order
+        report = {}
+        for offset in range(self.days):
+            cells = [self.runs(offset, period) for period in range(len(PERIODS))]
+            if any(cells):
+                report[self.day(offset)] = {
+                    name: [{"Time": run.time, "Distance": run.distance, "Pace": run.pace} for run in reversed(runs)]
+                    for name, runs in zip(PERIODS, cells)
+                }
+        return report
+
+    @classmethod
+    def from_report(cls, report: Dict[date, Dict[str, list]], first_day: Optional[date] = None,
+                    days: Optional[int] = None) -> "ReportGrid":
+        if first_day is None:
+            if not report:
+                raise Exception("No data found for the selected date range")
+            first_day = min(report)
+        if days is None:
+            days = (max(report, default=first_day) - first_day).days + 1
+        grid = cls(first_day, days)
+        for day, periods in report.items():
+            offset = (day - first_day).days
+            if not 0 <= offset < days:
+                continue
+            for period, name in enumerate(PERIODS):
+                for item in reversed(periods.get(name, [])):
+                    grid.add(offset, period, Run(
+                        item["Distance"], duration_seconds(item["Time"]), duration_seconds(item["Pace"]),
+                        item["Time"], item["Pace"],
+                    ))
+        return grid
+
+    def __eq__(self, other: object) -> bool:
+        return (
+            isinstance(other, ReportGrid)
+            and (self.first_day, self.days, self.cells, self.fields) == (other.first_day, other.days, other.cells, other.fields)
+        )
+
+
+def duration_seconds(text: object) -> Optional[float]:
+    # "01:16:22", "45:12" or "4:53" to seconds, None for anything else
+    if not isinstance(text, str):
+        return None
+    seconds = 0.0
+    try:
+        for part in text.split(":"):
+            seconds = seconds * 60 + float(part)
+    except ValueError:
+        return None
+    return seconds
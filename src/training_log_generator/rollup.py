@@ -0,0 +1,123 @@
+from datetime import date, timedelta
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from durations import parse_durations
+
+FIELDS = ["distance", "seconds", "runs", "morning", "afternoon"]
+
+
+class Rollup:
+    # per-day totals over a contiguous range of days, with running sums alongside,
+    # so the totals of any date range are two lookups whatever its length
+    def __init__(self, first_day: date, daily: Dict[str, np.ndarray]):
+        self.first_day = first_day
+        self.daily = daily
+        self.prefix: Dict[str, np.ndarray] = {}
+        self.__refresh_prefix(0)
+
+    @property
+    def days(self) -> int:
+        return len(self.daily["runs"])
+
+    @property
+    def last_day(self) -> date:
+        return self.first_day + timedelta(days=self.days - 1)
+
+    @classmethod
+    def empty(cls) -> "Rollup":
+        return cls(date.today(), {field: np.zeros(0) for field in FIELDS})
+
+    @classmethod
+    def from_frame(cls, data: pd.DataFrame) -> "Rollup":
+        # data shaped like DataLoader.load_data, usually the whole history
+        rollup = cls.empty()
+        rollup.add(data)
+        return rollup
+
+    @classmethod
+    def from_daily(cls, daily: pd.DataFrame) -> "Rollup":
+        # one row per day with a date column and the FIELDS, as kept by ActivityStore
+        rollup = cls.empty()
+        if daily.empty:
+            return rollup
+        days = pd.to_datetime(daily["date"])
+        rollup.first_day = days.min().date()
+        offsets = ((days - days.min()) // timedelta(days=1)).to_numpy()
+        size = int(offsets.max()) + 1
+        rollup.daily = {field: np.bincount(offsets, weights=daily[field].to_numpy(float), minlength=size) for field in FIELDS}
+        rollup.prefix = {}
+        rollup.__refresh_prefix(0)
+        return rollup
+
+    def add(self, data: pd.DataFrame) -> None:
+        # folds new activities in; only the running sums from the earliest new day onwards are recomputed
+        data = data[data["Date"].notna()]
+        if data.empty:
+            return
+        first_new, last_new = data["Date"].min().date(), data["Date"].max().date()
+        if not self.days:
+            self.first_day = first_new
+            self.prefix = {}
+        self.__extend(min(first_new, self.first_day), max(last_new, self.last_day) if self.days else last_new)
+
+        offsets = ((data["Date"] - pd.Timestamp(self.first_day)) // timedelta(days=1)).to_numpy()
+        for field, values in daily_values(data).items():
+            self.daily[field] += np.bincount(offsets, weights=values, minlength=self.days)
+        self.__refresh_prefix(int(offsets.min()))
+
+    def totals(self, first_day: Optional[date] = None, last_day: Optional[date] = None) -> Dict[str, float]:
+        # both days included
+        start = 0 if first_day is None else min(max((first_day - self.first_day).days, 0), self.days)
+        end = self.days if last_day is None else min(max((last_day - self.first_day).days + 1, 0), self.days)
+        end = max(start, end)
+        return {field: float(self.prefix[field][end] - self.prefix[field][start]) for field in FIELDS}
+
+    def daily_frame(self) -> pd.DataFrame:
+        index = pd.date_range(self.first_day, periods=self.days, freq="D", name="date")
+        return pd.DataFrame(self.daily, index=index)
+
+    def weekly(self, first_day: Optional[date] = None, last_day: Optional[date] = None) -> pd.DataFrame:
+        # one row per ISO week, indexed by its monday, straight from the running sums
+        if not self.days:
+            return pd.DataFrame(columns=FIELDS, index=pd.DatetimeIndex([], name="week"))
+        first_day = first_day or self.first_day
+        last_day = last_day or self.last_day
+        first_monday = first_day - timedelta(days=first_day.weekday())
+        mondays = pd.date_range(first_monday, last_day, freq="7D", name="week")
+        offsets = ((mondays - pd.Timestamp(self.first_day)) // timedelta(days=1)).to_numpy()
+        starts, ends = np.clip(offsets, 0, self.days), np.clip(offsets + 7, 0, self.days)
+        return pd.DataFrame({field: self.prefix[field][ends] - self.prefix[field][starts] for field in FIELDS}, index=mondays)
+
+    def __extend(self, first_day: date, last_day: date) -> None:
+        # new days are empty: running sums stay zero before the old range and flat after it
+        before = max((self.first_day - first_day).days, 0) if self.days else 0
+        after = max((last_day - self.last_day).days, 0) if self.days else (last_day - first_day).days + 1
+        if before or after:
+            self.daily = {field: np.pad(values, (before, after)) for field, values in self.daily.items()}
+            self.prefix = {field: np.pad(np.pad(prefix, (before, 0)), (0, after), mode="edge")
+                           for field, prefix in self.prefix.items()}
+            self.first_day = first_day
+
+    def __refresh_prefix(self, start: int) -> None:
+        for field, values in self.daily.items():
+            prefix = self.prefix.get(field)
+            if prefix is None:
+                self.prefix[field] = np.concatenate([[0.0], np.cumsum(values)])
+            else:
+                prefix[start + 1:] = prefix[start] + np.cumsum(values[start:])
+
+
+def daily_values(data: pd.DataFrame) -> Dict[str, np.ndarray]:
+    # the per-activity amounts summed into a rollup, missing values counting as zero
+    times = data["Time"]
+    seconds = times.astype(float) if pd.api.types.is_integer_dtype(times) else parse_durations(times)
+    return {
+        "distance": pd.to_numeric(data["Distance"], errors="coerce").fillna(0).to_numpy(float),
+        "seconds": seconds.fillna(0).to_numpy(float),
+        "runs": np.ones(len(data)),
+        "morning": (data["am_pm"] == "morning").to_numpy(float),
+        "afternoon": (data["am_pm"] == "afternoon").to_numpy(float),
+    }
@@ -0,0 +1,88 @@
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+# like engines, this module only needs the header row and must not import pandas
+
+
+class ExportLocale(NamedTuple):
+    # the export's names for the columns the report uses, in one Garmin Connect language
+    code: str
+    date: str
+    distance: str
+    time: str
+    pace: str
+    speed: str
+
+    def names(self) -> Dict[str, str]:
+        # export name -> report (English) name
+        return {self.date: "Date", self.distance: "Distance", self.time: "Time", self.pace: "Avg Pace",
+                self.speed: "Avg Speed"}
+
+
+class ExportSchema(NamedTuple):
+    locale: str
+    # export name -> report name, for the columns present in this export
+    columns: Dict[str, str]
+    # the export has an average speed in km/h instead of a pace, see durations.pace_from_speed
+    speed: bool
+
+    def column(self, name: str) -> str:
+        # the export's own name for a report column
+        return next(variant for variant, report_name in self.columns.items() if report_name == name)
+
+
+class UnknownExport(ValueError):
+    pass
+
+
+REQUIRED_COLUMNS = ["Date", "Distance", "Time"]
+
+# in detection order: on a tie (French shares "Date" and "Distance" with English) the first one wins
+LOCALES: Dict[str, ExportLocale] = {}
+
+
+def register_locale(locale: ExportLocale) -> None:
+    LOCALES[locale.code] = locale
+
+
+for _locale in [
+    ExportLocale("en", "Date", "Distance", "Time", "Avg Pace", "Avg Speed"),
+    ExportLocale("pt", "Data", "Distância", "Tempo", "Ritmo médio", "Velocidade média"),
+    ExportLocale("es", "Fecha", "Distancia", "Tiempo", "Ritmo medio", "Velocidad media"),
+    ExportLocale("fr", "Date", "Distance", "Durée", "Allure moyenne", "Vitesse moyenne"),
+    ExportLocale("it", "Data", "Distanza", "Tempo", "Passo medio", "Velocità media"),
+    ExportLocale("de", "Datum", "Distanz", "Zeit", "Ø Pace", "Ø Geschwindigkeit"),
+    ExportLocale("nl", "Datum", "Afstand", "Tijd", "Gemiddeld tempo", "Gemiddelde snelheid"),
+]:
+    register_locale(_locale)
+
+
+def detect_schema(header: Iterable[str]) -> ExportSchema:
+    # the locale naming most of the header's columns, checked from the header row alone so
+    # every export is parsed once, already knowing which column is which
+    present = set(header)
+    best: Optional[ExportLocale] = None
+    best_score = 0
+    for locale in LOCALES.values():
+        score = len(present.intersection(locale.names()))
+        if score > best_score:
+            best, best_score = locale, score
+    if best is None:
+        raise UnknownExport(f"no known export language in columns {sorted(present)}")
+
+    names = best.names()
+    columns = {variant: name for variant, name in names.items() if variant in present}
+    missing = [name for name in REQUIRED_COLUMNS if name not in columns.values()]
+    if "Avg Pace" not in columns.values() and "Avg Speed" not in columns.values():
+        missing.append("Avg Pace")
+    if missing:
+        raise UnknownExport(f"{best.code} export without {', '.join(missing)} in columns {sorted(present)}")
+
+    speed = "Avg Pace" not in columns.values()
+    if not speed:
+        columns.pop(best.speed, None)
+    return ExportSchema(best.code, columns, speed)
+
+
+def text_column_names(names: List[str]) -> List[str]:
+    # every registered export name of the given report columns
+    return [variant for locale in LOCALES.values() for variant, name in locale.names().items() if name in names]
@@ -0,0 +1,62 @@
+import argparse
+import sys
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from analytics import CHRONIC_DAYS, TrainingLoad
+from archive import write_weekly_archive
+from cache import ParsedExportCache
+from dataloader import DataLoader
+from generate import start_day_argument
+from report import ReportGenerator
+from renderer import TemplateRenderer
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Render several training weeks into one document")
+    parser.add_argument("file_path", help="Garmin activities export (.csv)")
+    parser.add_argument("--end-day", required=True, type=start_day_argument, help="last day of the block, e.g. 2024-03-10")
+    parser.add_argument("--weeks", type=int, default=16)
+    parser.add_argument("--since", type=start_day_argument, default=None, help="first day of the block, instead of --weeks")
+    parser.add_argument("--name", default="Diogo")
+    parser.add_argument("--output", default=None, help="- writes an --archive to stdout")
+    parser.add_argument("--template", default="data/log_template.docx")
+    parser.add_argument("--no-cache", action="store_true", help="always re-parse the export")
+    parser.add_argument("--archive", action="store_true", help="a zip with one document per week instead of a single document")
+    parser.add_argument("--training-load", action="store_true",
+                        help="fill the ACUTE_DISTANCE, CHRONIC_DISTANCE and ACWR fields of every week")
+    args = parser.parse_args(argv)
+
+    # the export is loaded once for the whole block and split into weeks afterwards
+    if args.since:
+        number_of_days = (datetime.fromisoformat(args.end_day) - datetime.fromisoformat(args.since)).days
+        if number_of_days < 0:
+            parser.error("--since must not be after --end-day")
+    else:
+        number_of_days = args.weeks * 7 - 1
+    cache = None if args.no_cache else ParsedExportCache()
+    # the training load of the first week needs the four weeks before it too
+    history_days = number_of_days + (CHRONIC_DAYS if args.training_load else 0)
+    data = DataLoader(args.file_path, args.end_day, history_days, cache=cache).load_data()
+
+    weeks = ReportGenerator(data).compile_grid(args.end_day, number_of_days).weeks()
+    if args.training_load:
+        load = TrainingLoad.from_frame(data, datetime.fromisoformat(args.end_day).date() - timedelta(days=history_days))
+        for monday, week in weeks.items():
+            week.fields.update(load.fields(monday + timedelta(days=6)))
+
+    renderer = TemplateRenderer(args.template)
+    if args.archive:
+        output_path = args.output or f"./Registo_Treino {args.name} ({len(weeks)} semanas).zip"
+        write_weekly_archive(weeks, renderer, sys.stdout.buffer if output_path == "-" else output_path, args.name)
+        print(f"{len(weeks)} weekly logs written to {output_path}", file=sys.stderr)
+        return 0
+
+    output_path = args.output or f"./Registo_Treino {args.name} ({len(weeks)} semanas).docx"
+    renderer.render_season(weeks, output_path)
+    print(f"Report generated at {output_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
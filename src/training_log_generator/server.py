@@ -0,0 +1,207 @@
+import argparse
+import asyncio
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Deque, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, quote, urlsplit
+
+from worker import generate_report_bytes, init_worker
+
+DOCX_MIME = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+MAX_BODY_BYTES = 64 * 1024 * 1024
+LATENCY_WINDOW = 1000
+REASONS = {
+    200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 411: "Length Required",
+    413: "Payload Too Large", 422: "Unprocessable Entity", 429: "Too Many Requests", 500: "Internal Server Error",
+}
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class ReportService:
+    # POST /reports?start_day=2024-03-10&name=Diogo with the CSV export as the request body returns the .docx,
+    # GET /metrics returns queue depth and latency figures as JSON
+    def __init__(self, template_path: str = "data/log_template.docx", workers: Optional[int] = None,
+                 max_queue: int = 32, use_cache: bool = True):
+        self.workers = workers or os.cpu_count() or 1
+        # jobs admitted at once, running or waiting for a worker; anything beyond that is rejected with 429
+        self.max_queue = max_queue
+        self.executor = ProcessPoolExecutor(self.workers, initializer=init_worker, initargs=(template_path, use_cache))
+        self.in_flight = 0
+        self.counters = {"accepted": 0, "completed": 0, "failed": 0, "rejected": 0}
+        self.latencies: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self.started = time.time()
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            try:
+                method, target, headers = await self.__read_head(reader)
+                body = await self.__read_body(reader, writer, method, headers)
+                status, response_headers, payload = await self.__dispatch(method, target, body)
+            except HTTPError as e:
+                status, response_headers, payload = self.__json(e.status, {"error": str(e)})
+            except (asyncio.IncompleteReadError, ConnectionError):
+                return
+            await self.__respond(writer, status, response_headers, payload)
+        finally:
+            writer.close()
+
+    def metrics(self) -> Dict[str, object]:
+        latencies = sorted(self.latencies)
+        return {
+            **self.counters,
+            "in_flight": self.in_flight,
+            "queue_depth": max(self.in_flight - self.workers, 0),
+            "max_queue": self.max_queue,
+            "workers": self.workers,
+            "uptime_s": round(time.time() - self.started, 1),
+            "latency_ms": {
+                "count": len(latencies),
+                "mean": round(sum(latencies) / len(latencies) * 1000, 2) if latencies else None,
+                "p50": self.__percentile(latencies, 0.50),
+                "p95": self.__percentile(latencies, 0.95),
+                "p99": self.__percentile(latencies, 0.99),
+                "max": round(latencies[-1] * 1000, 2) if latencies else None,
+            },
+        }
+
+    def close(self) -> None:
+        self.executor.shutdown(cancel_futures=True)
+
+    async def __dispatch(self, method: str, target: str, body: bytes) -> Tuple[int, Dict[str, str], bytes]:
+        url = urlsplit(target)
+        if url.path == "/metrics":
+            return self.__json(200, self.metrics())
+        if url.path == "/health":
+            return self.__json(200, {"status": "ok"})
+        if url.path != "/reports":
+            raise HTTPError(404, f"Unknown path {url.path}")
+        if method != "POST":
+            raise HTTPError(405, "Use POST with the CSV export as the body")
+
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        if "start_day" not in query:
+            raise HTTPError(400, "start_day is required")
+        name = query.get("name", "Diogo")
+        try:
+            number_of_days = int(query.get("days", 6))
+        except ValueError:
+            raise HTTPError(400, "days must be an integer")
+        if not body:
+            raise HTTPError(400, "The request body must contain the CSV export")
+
+        document = await self.__generate(body, query["start_day"], number_of_days)
+        file_name = quote(f"Registo_Treino {name}.docx")
+        return 200, {"Content-Type": DOCX_MIME, "Content-Disposition": f"attachment; filename*=UTF-8''{file_name}"}, document
+
+    async def __generate(self, csv_bytes: bytes, start_day: str, number_of_days: int) -> bytes:
+        if self.in_flight >= self.max_queue:
+            self.counters["rejected"] += 1
+            raise HTTPError(429, "Too many reports in progress, retry shortly")
+
+        self.in_flight += 1
+        self.counters["accepted"] += 1
+        started = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            document = await loop.run_in_executor(self.executor, generate_report_bytes, csv_bytes, start_day, number_of_days)
+        except Exception as e:
+            self.counters["failed"] += 1
+            raise HTTPError(422, f"{type(e).__name__}: {e}")
+        finally:
+            self.in_flight -= 1
+        self.counters["completed"] += 1
+        self.latencies.append(time.perf_counter() - started)
+        return document
+
+    @staticmethod
+    async def __read_head(reader: asyncio.StreamReader) -> Tuple[str, str, Dict[str, str]]:
+        request_line = (await reader.readline()).decode("latin-1").strip()
+        try:
+            method, target, _ = request_line.split(" ", 2)
+        except ValueError:
+            raise HTTPError(400, "Malformed request line")
+        headers = {}
+        while True:
+            line = (await reader.readline()).decode("latin-1")
+            if line in ("\r\n", "\n", ""):
+                break
+            key, _, value = line.partition(":")
+            headers[key.strip().lower()] = value.strip()
+        return method.upper(), target, headers
+
+    @staticmethod
+    async def __read_body(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, method: str,
+                          headers: Dict[str, str]) -> bytes:
+        if method != "POST":
+            return b""
+        if "content-length" not in headers:
+            raise HTTPError(411, "Content-Length is required")
+        try:
+            length = int(headers["content-length"])
+        except ValueError:
+            raise HTTPError(400, "Content-Length must be an integer")
+        if length > MAX_BODY_BYTES:
+            raise HTTPError(413, f"Exports larger than {MAX_BODY_BYTES} bytes are not accepted")
+        # curl and most clients wait for this before sending large uploads
+        if headers.get("expect", "").lower() == "100-continue":
+            writer.write(b"HTTP/1.1 100 Continue\r\n\r\n")
+            await writer.drain()
+        return await reader.readexactly(length)
+
+    @staticmethod
+    async def __respond(writer: asyncio.StreamWriter, status: int, headers: Dict[str, str], payload: bytes) -> None:
+        head = [f"HTTP/1.1 {status} {REASONS.get(status, '')}", f"Content-Length: {len(payload)}", "Connection: close"]
+        if status == 429:
+            head.append("Retry-After: 1")
+        head += [f"{key}: {value}" for key, value in headers.items()]
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + payload)
+        await writer.drain()
+
+    @staticmethod
+    def __json(status: int, content: Dict[str, object]) -> Tuple[int, Dict[str, str], bytes]:
+        return status, {"Content-Type": "application/json"}, json.dumps(content).encode("utf-8")
+
+    @staticmethod
+    def __percentile(latencies: List[float], fraction: float) -> Optional[float]:
+        if not latencies:
+            return None
+        return round(latencies[min(int(len(latencies) * fraction), len(latencies) - 1)] * 1000, 2)
+
+
+async def serve(service: ReportService, host: str, port: int) -> None:
+    server = await asyncio.start_server(service.handle_connection, host, port)
+    print(f"Serving training logs on http://{host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="HTTP service that turns Garmin exports into training logs")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--template", default="data/log_template.docx")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per CPU)")
+    parser.add_argument("--max-queue", type=int, default=32, help="reports admitted at once before answering 429")
+    parser.add_argument("--no-cache", action="store_true", help="always re-parse the exports")
+    args = parser.parse_args(argv)
+
+    service = ReportService(args.template, args.workers, args.max_queue, not args.no_cache)
+    try:
+        asyncio.run(serve(service, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,189 @@
+import csv
+import mmap
+import os
+from datetime import date, datetime
+from typing import List, Optional, Tuple
+
+from engines import DATE_FORMATS
+from schema import UnknownExport, detect_schema
+
+# evenly spaced lines checked for date order before trusting the binary search
+SORT_CHECK_SAMPLES = 32
+# lines skipped past a probe that does not parse (a quoted field with a line break in it)
+MAX_SKIPPED_LINES = 8
+
+
+class UnsortedExport(Exception):
+    pass
+
+
+class SortedExport:
+    # binary search over the line boundaries of a date-ordered export, so a date window is found
+    # by reading a few dozen lines instead of the whole file
+    def __init__(self, mapped: mmap.mmap):
+        self.mapped = mapped
+        self.size = len(mapped)
+        header_end = self.__line_end(0)
+        self.header = bytes(mapped[:header_end])
+        self.data_start = min(header_end + 1, self.size)
+        columns = next(csv.reader([self.header.decode("utf-8-sig")]))
+        self.field_count = len(columns)
+        try:
+            self.date_index = columns.index(detect_schema(columns).column("Date"))
+        except UnknownExport:
+            # left to the full read, which reports what is missing
+            raise UnsortedExport("unknown columns")
+        self.date_format: Optional[str] = None
+
+    def window(self, first_day: date, last_day: date) -> Tuple[int, int]:
+        # byte range of every line dated first_day to last_day, both included
+        first, last = self.__first_line(), self.__last_line()
+        if first is None or last is None:
+            raise UnsortedExport("no dated lines")
+        newest_first = first[2] > last[2]
+        self.__check_order(newest_first)
+
+        if newest_first:
+            start = self.__lower_bound(lambda day: day <= last_day)
+            end = self.__lower_bound(lambda day: day < first_day)
+        else:
+            start = self.__lower_bound(lambda day: day >= first_day)
+            end = self.__lower_bound(lambda day: day > last_day)
+        end = max(start, end)
+        self.__check_range(start, end, first_day, last_day, newest_first)
+        return start, end
+
+    def __check_range(self, start: int, end: int, first_day: date, last_day: date, newest_first: bool) -> None:
+        # the sampled check cannot see a single line out of place, so every line of the range is
+        # checked to be in order and in the window, and the lines on either side to be outside it
+        days: List[date] = []
+        position = start
+        while position < end:
+            line_end = self.__line_end(position)
+            day = self.__parse_day(self.mapped[position:line_end])
+            if day is not None:
+                if not first_day <= day <= last_day:
+                    raise UnsortedExport("line out of order inside the window")
+                days.append(day)
+            position = line_end + 1
+        if newest_first:
+            days.reverse()
+        if any(later < earlier for earlier, later in zip(days, days[1:])):
+            raise UnsortedExport("lines are not in date order")
+
+        before = self.__line_before(start)
+        after = self.__probe(end) if end < self.size else None
+        for line in [before, after]:
+            if line is not None and first_day <= line[2] <= last_day:
+                raise UnsortedExport("window continues past the range found")
+
+    def __check_order(self, newest_first: bool) -> None:
+        days: List[date] = []
+        step = max((self.size - self.data_start) // SORT_CHECK_SAMPLES, 1)
+        for position in range(self.data_start, self.size, step):
+            line = self.__probe(position)
+            if line is not None:
+                days.append(line[2])
+        if newest_first:
+            days.reverse()
+        if any(later < earlier for earlier, later in zip(days, days[1:])):
+            raise UnsortedExport("lines are not in date order")
+
+    def __lower_bound(self, condition) -> int:
+        # start of the first line whose day meets the condition, which holds for every line after it
+        result = self.size
+        low, high = self.data_start, self.size
+        while low < high:
+            middle = (low + high) // 2
+            line = self.__probe(middle, high)
+            if line is None:
+                high = middle
+                continue
+            start, end, day = line
+            if condition(day):
+                result = start
+                high = middle
+            else:
+                low = end + 1
+        return result
+
+    def __probe(self, position: int, limit: Optional[int] = None) -> Optional[Tuple[int, int, date]]:
+        # the first line starting at or after position (and before limit) with a readable date
+        limit = self.size if limit is None else limit
+        start = position if position == self.data_start or self.mapped[position - 1] == 0x0A else self.__line_end(position) + 1
+        for _ in range(MAX_SKIPPED_LINES):
+            if start >= limit:
+                return None
+            end = self.__line_end(start)
+            day = self.__parse_day(self.mapped[start:end])
+            if day is not None:
+                return start, end, day
+            start = end + 1
+        raise UnsortedExport("too many unreadable lines")
+
+    def __first_line(self) -> Optional[Tuple[int, int, date]]:
+        return self.__probe(self.data_start)
+
+    def __last_line(self) -> Optional[Tuple[int, int, date]]:
+        end = self.size
+        for _ in range(MAX_SKIPPED_LINES):
+            if end <= self.data_start:
+                return None
+            start = max(self.mapped.rfind(b"\n", self.data_start, end - 1) + 1, self.data_start)
+            day = self.__parse_day(self.mapped[start:end])
+            if day is not None:
+                return start, end, day
+            end = start
+        raise UnsortedExport("too many unreadable lines")
+
+    def __line_before(self, position: int) -> Optional[Tuple[int, int, date]]:
+        # the closest readable line ending before position
+        end = position - 1
+        for _ in range(MAX_SKIPPED_LINES):
+            if end <= self.data_start:
+                return None
+            start = max(self.mapped.rfind(b"\n", self.data_start, end) + 1, self.data_start)
+            day = self.__parse_day(self.mapped[start:end])
+            if day is not None:
+                return start, end, day
+            end = start - 1
+        raise UnsortedExport("too many unreadable lines")
+
+    def __line_end(self, position: int) -> int:
+        end = self.mapped.find(b"\n", position)
+        return self.size if end < 0 else end
+
+    def __parse_day(self, line: bytes) -> Optional[date]:
+        try:
+            fields = next(csv.reader([line.decode("utf-8").rstrip("\r\n")]))
+        except (UnicodeDecodeError, StopIteration, csv.Error):
+            return None
+        if len(fields) != self.field_count:
+            return None
+        value = fields[self.date_index]
+        formats = [self.date_format] if self.date_format else DATE_FORMATS
+        for date_format in formats:
+            try:
+                parsed = datetime.strptime(value, date_format)
+            except ValueError:
+                continue
+            self.date_format = date_format
+            return parsed.date()
+        return None
+
+
+def read_window(file_path: str, first_day: date, last_day: date) -> Optional[bytes]:
+    # the header and the lines of the window, as a CSV of their own; None when the export
+    # is not sorted by date (or the window cannot be found safely) and has to be scanned
+    if os.path.getsize(file_path) == 0:
+        return None
+    with open(file_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        try:
+            export = SortedExport(mapped)
+            start, end = export.window(first_day, last_day)
+        except UnsortedExport:
+            return None
+        body = mapped[start:end]
+        if body and not body.endswith(b"\n"):
+            body += b"\n"
+        return export.header + b"\n" + body
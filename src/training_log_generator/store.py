@@ -0,0 +1,194 @@
+import argparse
+import sqlite3
+from datetime import timedelta
+from typing import IO, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from cache import hash_export
+from dataloader import DataLoader
+from rollup import FIELDS, Rollup, daily_values
+
+INGEST_CHUNK_SIZE = 10_000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS activities (
+    start_ts INTEGER NOT NULL,
+    date TEXT NOT NULL,
+    distance REAL NOT NULL,
+    time TEXT,
+    avg_pace TEXT,
+    UNIQUE (start_ts, distance)
+);
+CREATE INDEX IF NOT EXISTS activities_date ON activities (date);
+CREATE TABLE IF NOT EXISTS imports (
+    file_hash TEXT PRIMARY KEY,
+    imported_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    rows_added INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS daily_rollup (
+    date TEXT PRIMARY KEY,
+    distance REAL NOT NULL,
+    seconds REAL NOT NULL,
+    runs INTEGER NOT NULL,
+    morning INTEGER NOT NULL,
+    afternoon INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS rollup_state (
+    last_rowid INTEGER NOT NULL
+);
+"""
+
+
+class ActivityStore:
+    # activities from every export ever imported, deduplicated on start time and distance,
+    # so a weekly report is an indexed range scan instead of a reparse of the whole history
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.connection = sqlite3.connect(db_path)
+        self.connection.executescript(SCHEMA)
+        # stores created before the rollup existed catch up here
+        with self.connection:
+            self.__update_rollup()
+
+    def ingest(self, file_path: Union[str, IO[bytes]], full: bool = False) -> int:
+        file_hash = hash_export(file_path)
+        if self.connection.execute("SELECT 1 FROM imports WHERE file_hash = ?", (file_hash,)).fetchone():
+            return 0
+
+        # newest-first exports are only read until they reach activities already stored,
+        # pass full=True to rescan an export that back-fills older activities
+        newest_stored = None if full else self.connection.execute("SELECT MAX(start_ts) FROM activities").fetchone()[0]
+        changes_before = self.connection.total_changes
+        newest_first = True
+        previous_start = None
+
+        with self.connection:
+            for chunk in DataLoader(file_path).read_chunks(INGEST_CHUNK_SIZE):
+                start = (chunk["Date"] + chunk["Time_of_Day"]).dropna()
+                rows = chunk.loc[start.index]
+                start_ts = start.to_numpy("datetime64[s]").astype(np.int64)
+                self.connection.executemany(
+                    "INSERT OR IGNORE INTO activities (start_ts, date, distance, time, avg_pace) VALUES (?, ?, ?, ?, ?)",
+                    zip(
+                        start_ts.tolist(),
+                        rows["Date"].dt.strftime("%Y-%m-%d").tolist(),
+                        rows["Distance"].astype(float).tolist(),
+                        rows["Time"].astype(object).where(rows["Time"].notna(), None).tolist(),
+                        rows["Avg Pace"].astype(object).where(rows["Avg Pace"].notna(), None).tolist(),
+                    ),
+                )
+
+                if start_ts.size == 0:
+                    continue
+                newest_first = newest_first and bool(np.all(np.diff(start_ts) <= 0)) and (previous_start is None or previous_start >= start_ts[0])
+                previous_start = int(start_ts[-1])
+                if newest_first and newest_stored is not None and previous_start < newest_stored:
+                    break
+
+            rows_added = self.connection.total_changes - changes_before
+            self.__update_rollup()
+            self.connection.execute("INSERT INTO imports (file_hash, rows_added) VALUES (?, ?)", (file_hash, rows_added))
+        return rows_added
+
+    def query(self, start_day: str, number_of_days: int) -> pd.DataFrame:
+        # same columns as DataLoader.load_data, newest activity first like a Garmin export
+        last_day = pd.to_datetime(start_day).normalize()
+        first_day = last_day - timedelta(days=number_of_days)
+        df = pd.read_sql_query(
+            "SELECT start_ts, distance, time, avg_pace FROM activities WHERE date BETWEEN ? AND ? ORDER BY start_ts DESC",
+            self.connection,
+            params=(first_day.strftime("%Y-%m-%d"), last_day.strftime("%Y-%m-%d")),
+        )
+        return activities_frame(df)
+
+    def rollup(self) -> Rollup:
+        return Rollup.from_daily(pd.read_sql_query("SELECT * FROM daily_rollup", self.connection))
+
+    def __update_rollup(self) -> None:
+        # folds the activities added since the last update into the per-day totals; activities are
+        # only ever inserted, so everything past the last rowid rolled up is new
+        last_rowid = self.connection.execute("SELECT MAX(last_rowid) FROM rollup_state").fetchone()[0] or 0
+        df = pd.read_sql_query(
+            "SELECT rowid, start_ts, distance, time, avg_pace FROM activities WHERE rowid > ?",
+            self.connection,
+            params=(last_rowid,),
+        )
+        if df.empty:
+            return
+        data = activities_frame(df)
+        days = pd.DataFrame(daily_values(data)).groupby(data["Date"].dt.strftime("%Y-%m-%d").to_numpy()).sum()
+        self.connection.executemany(
+            f"INSERT INTO daily_rollup (date, {', '.join(FIELDS)}) VALUES (?, ?, ?, ?, ?, ?) "
+            f"ON CONFLICT (date) DO UPDATE SET {', '.join(f'{field} = {field} + excluded.{field}' for field in FIELDS)}",
+            days[FIELDS].itertuples(name=None),
+        )
+        self.connection.execute("DELETE FROM rollup_state")
+        self.connection.execute("INSERT INTO rollup_state (last_rowid) VALUES (?)", (int(df["rowid"].max()),))
+
+    def count(self) -> int:
+        return self.connection.execute("SELECT COUNT(*) FROM activities").fetchone()[0]
+
+    def close(self) -> None:
+        self.connection.close()
+
+
+def activities_frame(df: pd.DataFrame) -> pd.DataFrame:
+    # stored rows back in the shape of DataLoader.load_data
+    start = pd.to_datetime(df["start_ts"], unit="s")
+    data = pd.DataFrame({"Date": start.dt.normalize()})
+    data["Time_of_Day"] = start - data["Date"]
+    data["Distance"] = df["distance"]
+    data["Time"] = df["time"]
+    data["Avg Pace"] = df["avg_pace"]
+    data["am_pm"] = np.where(start.dt.hour < 12, "morning", "afternoon")
+    return data
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Local activity store fed by Garmin exports")
+    parser.add_argument("--db", default="activities.sqlite")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    ingest = commands.add_parser("ingest", help="import new activities from one or more exports")
+    ingest.add_argument("files", nargs="+")
+    ingest.add_argument("--full", action="store_true", help="read every row instead of stopping at known activities")
+
+    report = commands.add_parser("report", help="render a weekly log straight from the store")
+    report.add_argument("--start-day", required=True)
+    report.add_argument("--days", type=int, default=6)
+    report.add_argument("--name", default="Diogo")
+    report.add_argument("--template", default="data/log_template.docx")
+    report.add_argument("--output", default=None)
+
+    history = commands.add_parser("history", help="weekly totals from the rollup, newest week last")
+    history.add_argument("--weeks", type=int, default=12)
+    args = parser.parse_args(argv)
+
+    store = ActivityStore(args.db)
+    try:
+        if args.command == "ingest":
+            for file_path in args.files:
+                print(f"{file_path}: {store.ingest(file_path, args.full)} new activities")
+            print(f"{store.count()} activities stored")
+        elif args.command == "history":
+            weekly = store.rollup().weekly().tail(args.weeks)
+            for monday, week in weekly.iterrows():
+                print(f"{monday:%Y-%m-%d}  {week['distance']:8.2f} km  {int(week['runs']):3d} runs  "
+                      f"{int(week['morning'])} morning / {int(week['afternoon'])} afternoon")
+        else:
+            from report import ReportGenerator
+            from renderer import TemplateRenderer
+
+            data = store.query(args.start_day, args.days)
+            output_path = args.output or f"./Registo_Treino {args.name}.docx"
+            TemplateRenderer(args.template).render_report(ReportGenerator(data).compile_grid(args.start_day, args.days), output_path)
+            print(f"Report generated at {output_path}")
+    finally:
+        store.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,166 @@
+import gzip
+import math
+import os
+import xml.etree.ElementTree as ElementTree
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from instrumentation import logger, stage
+
+TRACK_EXTENSIONS = (".gpx", ".tcx", ".gpx.gz", ".tcx.gz")
+# slower than this between two points counts as stopped (1.8 km/h), as for a moving time on the watch
+MIN_MOVING_SPEED = 0.5
+EARTH_RADIUS = 6_371_000.0
+# below this many files the pool costs more to start than it saves
+POOL_MIN_FILES = 8
+
+# the elements closing one activity and one point, in GPX and TCX
+ACTIVITY_TAGS = {"trk", "Activity"}
+POINT_TAGS = {"trkpt", "Trackpoint"}
+
+
+class TrackSummary:
+    # running totals of one activity, fed a point at a time so a track is never held in memory
+    __slots__ = ("start", "distance", "moving_seconds", "last_time", "last_position", "last_distance")
+
+    def __init__(self):
+        self.start: Optional[datetime] = None
+        self.distance = 0.0
+        self.moving_seconds = 0.0
+        self.last_time: Optional[datetime] = None
+        self.last_position = None
+        self.last_distance: Optional[float] = None
+
+    def add_point(self, time: Optional[datetime], position, recorded_distance: Optional[float]) -> None:
+        # recorded_distance is the device's cumulative distance (TCX), preferred over the GPS positions
+        step = 0.0
+        if recorded_distance is not None:
+            if self.last_distance is not None:
+                step = max(recorded_distance - self.last_distance, 0.0)
+            self.last_distance = recorded_distance
+        elif position is not None and self.last_position is not None:
+            step = haversine(self.last_position, position)
+        if position is not None:
+            self.last_position = position
+        self.distance += step
+
+        if time is None:
+            return
+        if self.start is None:
+            self.start = time
+        if self.last_time is not None:
+            seconds = (time - self.last_time).total_seconds()
+            if seconds > 0 and step / seconds >= MIN_MOVING_SPEED:
+                self.moving_seconds += seconds
+        self.last_time = time
+
+    def row(self) -> Optional[Dict[str, object]]:
+        # a row like the Garmin export has it, or None for a track without times
+        if self.start is None:
+            return None
+        # track times are UTC; exports are in the athlete's local time, taken to be this machine's
+        start = self.start.astimezone().replace(tzinfo=None) if self.start.tzinfo else self.start
+        kilometres = self.distance / 1000
+        moving = round(self.moving_seconds)
+        pace = round(self.moving_seconds / kilometres) if kilometres > 0 and moving else None
+        return {
+            "Date": start.strftime("%Y-%m-%d %H:%M:%S"),
+            "Distance": round(kilometres, 2),
+            "Time": f"{moving // 3600:02d}:{moving % 3600 // 60:02d}:{moving % 60:02d}",
+            # empty without moving time (a stationary or indoor track), as for a missing speed in an export
+            "Avg Pace": "" if pace is None else f"{pace // 60}:{pace % 60:02d}",
+        }
+
+
+def haversine(start, end) -> float:
+    # metres between two (lat, lon) points in degrees
+    lat1, lon1 = map(math.radians, start)
+    lat2, lon2 = map(math.radians, end)
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS * math.asin(math.sqrt(a))
+
+
+def parse_time(text: Optional[str]) -> Optional[datetime]:
+    if not text:
+        return None
+    try:
+        return datetime.fromisoformat(text.strip())
+    except ValueError:
+        return None
+
+
+def local_name(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def summarize_track(path: str) -> List[Dict[str, object]]:
+    # one row per activity in a GPX or TCX file (usually just one), streamed through iterparse;
+    # every point is cleared out of its parent once counted, so memory does not grow with the track
+    rows = []
+    opener = gzip.open if path.endswith(".gz") else open
+    try:
+        with opener(path, "rb") as f:
+            summary = TrackSummary()
+            parents = []
+            point: Dict[str, object] = {}
+            for event, element in ElementTree.iterparse(f, events=("start", "end")):
+                if event == "start":
+                    parents.append(element)
+                    continue
+                parents.pop()
+                tag = local_name(element.tag)
+                in_point = bool(parents) and local_name(parents[-1].tag) in POINT_TAGS
+                if tag in ("time", "Time") and in_point:
+                    point["time"] = parse_time(element.text)
+                elif tag == "DistanceMeters" and in_point:
+                    point["distance"] = float(element.text)
+                elif tag == "LatitudeDegrees":
+                    point["lat"] = float(element.text)
+                elif tag == "LongitudeDegrees":
+                    point["lon"] = float(element.text)
+                elif tag in POINT_TAGS:
+                    if "lat" in element.attrib:
+                        point["lat"], point["lon"] = float(element.attrib["lat"]), float(element.attrib["lon"])
+                    position = (point["lat"], point["lon"]) if "lat" in point and "lon" in point else None
+                    summary.add_point(point.get("time"), position, point.get("distance"))
+                    point = {}
+                    if parents:
+                        parents[-1].clear()
+                elif tag in ACTIVITY_TAGS:
+                    row = summary.row()
+                    if row is not None:
+                        rows.append(row)
+                    summary = TrackSummary()
+                    if parents:
+                        parents[-1].clear()
+    except (OSError, ElementTree.ParseError, ValueError, TypeError) as e:
+        logger.warning("Skipping unreadable track %s: %s", path, e)
+        return []
+    return rows
+
+
+def track_files(directory: str) -> List[str]:
+    return sorted(
+        os.path.join(directory, name) for name in os.listdir(directory)
+        if name.lower().endswith(TRACK_EXTENSIONS) and not name.startswith(".")
+    )
+
+
+def read_tracks(directory: str, workers: Optional[int] = None) -> pd.DataFrame:
+    # the folder's activities as the raw Date/Distance/Time/Avg Pace columns of an English export,
+    # newest first like Garmin writes them, ready for DataLoader.parse_dates
+    paths = track_files(directory)
+    workers = workers or os.cpu_count() or 1
+    with stage("load.tracks", len(paths)):
+        if len(paths) < POOL_MIN_FILES or workers == 1:
+            results = list(map(summarize_track, paths))
+        else:
+            chunksize = max(len(paths) // (4 * workers), 1)
+            with ProcessPoolExecutor(workers) as pool:
+                results = list(pool.map(summarize_track, paths, chunksize=chunksize))
+    rows = [row for file_rows in results for row in file_rows]
+    df = pd.DataFrame(rows, columns=["Date", "Distance", "Time", "Avg Pace"])
+    return df.sort_values("Date", ascending=False, kind="stable", ignore_index=True)
@@ -0,0 +1,256 @@
+import argparse
+import ctypes
+import ctypes.util
+import hashlib
+import json
+import os
+import select
+import struct
+import time
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from archive import week_file_name
+from cache import ParsedExportCache
+from dataloader import DataLoader
+from renderer import TemplateRenderer
+from report import ReportGenerator
+from report_grid import PERIODS, ReportGrid
+
+# inotify(7) events that mean a file in the folder may have new content
+IN_MODIFY = 0x002
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+INOTIFY_EVENT = struct.Struct("iIII")
+
+STATE_FILE = ".watch_state.json"
+
+
+class InotifyWatcher:
+    # names of files touched in the folder, straight from the kernel
+    def __init__(self, directory: str):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            raise OSError("inotify is not available")
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        if libc.inotify_add_watch(self.fd, os.fsencode(directory), WATCH_MASK) < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, f"cannot watch {directory}")
+
+    def changes(self, timeout: float) -> List[str]:
+        if not select.select([self.fd], [], [], timeout)[0]:
+            return []
+        try:
+            buffer = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        names = []
+        offset = 0
+        while offset < len(buffer):
+            _, _, _, length = INOTIFY_EVENT.unpack_from(buffer, offset)
+            offset += INOTIFY_EVENT.size
+            names.append(os.fsdecode(buffer[offset:offset + length].rstrip(b"\0")))
+            offset += length
+        return names
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class PollingWatcher:
+    # for platforms and file systems without inotify (macOS, Windows, network shares)
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.seen = self.__scan()
+
+    def changes(self, timeout: float) -> List[str]:
+        time.sleep(timeout)
+        current = self.__scan()
+        names = [name for name, signature in current.items() if self.seen.get(name) != signature]
+        self.seen = current
+        return names
+
+    def __scan(self) -> Dict[str, Tuple[int, int]]:
+        with os.scandir(self.directory) as entries:
+            return {entry.name: (entry.stat().st_mtime_ns, entry.stat().st_size) for entry in entries if entry.is_file()}
+
+    def close(self) -> None:
+        pass
+
+
+def open_watcher(directory: str, polling: bool = False):
+    if not polling:
+        try:
+            return InotifyWatcher(directory)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(directory)
+
+
+def week_fingerprint(week: ReportGrid) -> Optional[str]:
+    # None for a week without runs, so nothing is written for it
+    if not week.run_count():
+        return None
+    digest = hashlib.sha1()
+    for offset in range(week.days):
+        for period in range(len(PERIODS)):
+            for run in week.runs(offset, period):
+                digest.update(f"{offset}|{period}|{run.distance}|{run.time}|{run.pace};".encode("utf-8"))
+    return digest.hexdigest()
+
+
+class WatchService:
+    # one weekly log per athlete and ISO week, named after the export file ("Diogo.csv" -> "Diogo");
+    # the template and parse cache live as long as the process, and the week fingerprints are kept
+    # in the output folder so a restart does not re-render everything
+    def __init__(self, directory: str, output_dir: str, template_path: str, debounce: float = 2.0,
+                 use_cache: bool = True):
+        self.directory = directory
+        self.output_dir = output_dir
+        self.debounce = debounce
+        self.renderer = TemplateRenderer(template_path)
+        self.renderer.load_package()
+        self.cache = ParsedExportCache() if use_cache else None
+        self.state_path = os.path.join(output_dir, STATE_FILE)
+        self.state: Dict[str, Dict[str, str]] = self.__load_state()
+        # file name -> (last event time, size seen then); a file is read once both have settled
+        self.pending: Dict[str, Tuple[float, int]] = {}
+        # export path -> (its stat signature, the frame parsed from it), kept between events
+        self.frames: Dict[str, Tuple[Tuple[int, int, int], pd.DataFrame]] = {}
+
+    def run(self, polling: bool = False, interval: float = 1.0) -> None:
+        os.makedirs(self.output_dir, exist_ok=True)
+        watcher = open_watcher(self.directory, polling)
+        print(f"Watching {self.directory} ({type(watcher).__name__}), logs go to {self.output_dir}", flush=True)
+        # exports already in the folder are checked against the saved state first
+        for name in sorted(os.listdir(self.directory)):
+            self.notice(name)
+        try:
+            while True:
+                for name in watcher.changes(interval if not self.pending else min(interval, self.debounce / 2)):
+                    self.notice(name)
+                self.process_settled()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            watcher.close()
+
+    def notice(self, name: str) -> None:
+        if not name.lower().endswith(".csv") or name.startswith("."):
+            return
+        path = os.path.join(self.directory, name)
+        if os.path.isfile(path):
+            self.pending[name] = (time.monotonic(), os.path.getsize(path))
+
+    def process_settled(self) -> None:
+        now = time.monotonic()
+        for name, (seen_at, size) in list(self.pending.items()):
+            path = os.path.join(self.directory, name)
+            if not os.path.isfile(path):
+                del self.pending[name]
+                continue
+            current_size = os.path.getsize(path)
+            # still being written: wait for another quiet period
+            if current_size != size:
+                self.pending[name] = (now, current_size)
+                continue
+            if now - seen_at < self.debounce:
+                continue
+            del self.pending[name]
+            try:
+                self.process(path)
+            except Exception as e:
+                print(f"FAILED {name}: {type(e).__name__}: {e}", flush=True)
+
+    def process(self, path: str) -> List[date]:
+        started = time.perf_counter()
+        athlete = os.path.splitext(os.path.basename(path))[0]
+        data = self.__load(path)
+        weeks = ReportGenerator(data).compile_grid().weeks() if not data.empty else {}
+
+        previous = self.state.get(athlete, {})
+        fingerprints = {}
+        changed = []
+        for monday, week in weeks.items():
+            fingerprint = week_fingerprint(week)
+            if fingerprint is None:
+                continue
+            fingerprints[monday.isoformat()] = fingerprint
+            if previous.get(monday.isoformat()) != fingerprint:
+                self.renderer.render_report(week, self.__week_path(athlete, monday))
+                changed.append(monday)
+
+        # weeks whose runs were all deleted from the export lose their log as well
+        removed = [date.fromisoformat(monday) for monday in previous if monday not in fingerprints]
+        for monday in removed:
+            try:
+                os.remove(self.__week_path(athlete, monday))
+            except FileNotFoundError:
+                pass
+
+        self.state[athlete] = fingerprints
+        self.__save_state()
+        print(
+            f"{athlete}: {len(changed)} of {len(fingerprints)} weeks re-rendered, {len(removed)} removed "
+            f"in {time.perf_counter() - started:.2f}s",
+            flush=True,
+        )
+        return sorted(changed + removed)
+
+    def __load(self, path: str) -> pd.DataFrame:
+        # an event on a file that has not changed since (e.g. a touch, or a copy of the same bytes
+        # landing again) reuses the frame already parsed instead of hashing and reading the export
+        stat = os.stat(path)
+        signature = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        cached = self.frames.get(path)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        data = DataLoader(path, cache=self.cache).load_data()
+        self.frames[path] = (signature, data)
+        return data
+
+    def __week_path(self, athlete: str, monday: date) -> str:
+        athlete_dir = os.path.join(self.output_dir, athlete)
+        os.makedirs(athlete_dir, exist_ok=True)
+        return os.path.join(athlete_dir, week_file_name(athlete, monday))
+
+    def __load_state(self) -> Dict[str, Dict[str, str]]:
+        try:
+            with open(self.state_path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def __save_state(self) -> None:
+        tmp_path = self.state_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.state, f)
+        os.replace(tmp_path, self.state_path)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Keep weekly training logs up to date from a folder of exports")
+    parser.add_argument("directory", help="folder the Garmin exports are dropped into, one <athlete>.csv each")
+    parser.add_argument("--output-dir", default="logs")
+    parser.add_argument("--template", default="data/log_template.docx")
+    parser.add_argument("--debounce", type=float, default=2.0, help="seconds a file must stay unchanged before it is read")
+    parser.add_argument("--interval", type=float, default=1.0, help="seconds between checks")
+    parser.add_argument("--polling", action="store_true", help="poll the folder instead of using inotify")
+    parser.add_argument("--no-cache", action="store_true", help="always re-parse the exports")
+    args = parser.parse_args(argv)
+
+    WatchService(args.directory, args.output_dir, args.template, args.debounce, not args.no_cache).run(args.polling, args.interval)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,49 @@
+import io
+import os
+from typing import Optional, Tuple, Union, IO
+
+from archive import write_weekly_archive
+from cache import ParsedExportCache
+from dataloader import DataLoader
+from formats import get_renderer
+from report import ReportGenerator
+from renderer import TemplateRenderer
+
+# one renderer per worker process, so the template is only read once per worker
+_renderer: Optional[TemplateRenderer] = None
+_cache: Optional[ParsedExportCache] = None
+
+
+def init_worker(template_path: str, use_cache: bool = True) -> None:
+    global _renderer, _cache
+    _renderer = TemplateRenderer(template_path)
+    _renderer.load_package()
+    _cache = ParsedExportCache() if use_cache else None
+
+
+def generate_report(file_path: Union[str, IO[bytes]], start_day: str, number_of_days: int,
+                    output: Union[str, IO[bytes]]) -> int:
+    data = DataLoader(file_path, start_day, number_of_days, cache=_cache).load_data()
+    report = ReportGenerator(data).compile_grid(start_day, number_of_days)
+    _renderer.render_report(report, output)
+    return len(data)
+
+
+def generate_report_file(name: str, file_path: str, start_day: str, number_of_days: int, output_dir: str) -> Tuple[str, int]:
+    output_path = os.path.join(output_dir, f"Registo_Treino {name}.docx")
+    return output_path, generate_report(file_path, start_day, number_of_days, output_path)
+
+
+def generate_report_bytes(csv_bytes: bytes, start_day: str, number_of_days: int = 6, output_format: str = "docx") -> bytes:
+    renderer = _renderer if output_format == "docx" else get_renderer(output_format, _renderer.template_path)
+    data = DataLoader(io.BytesIO(csv_bytes), start_day, number_of_days, cache=_cache).load_data()
+    return renderer.render_bytes(ReportGenerator(data).compile_grid(start_day, number_of_days))
+
+
+def generate_archive_bytes(csv_bytes: bytes, end_day: str, weeks: int, name: str) -> bytes:
+    # every week of the block rendered into one zip, see archive.write_weekly_archive
+    number_of_days = weeks * 7 - 1
+    data = DataLoader(io.BytesIO(csv_bytes), end_day, number_of_days, cache=_cache).load_data()
+    output = io.BytesIO()
+    write_weekly_archive(ReportGenerator(data).compile_grid(end_day, number_of_days).weeks(), _renderer, output, name)
+    return output.getvalue()
@@ -0,0 +1,23 @@
+import pytest
+
+from synthetic import synthetic_export, write_export
+
+LAST_DAY = "2025-03-16"
+
+
+@pytest.fixture(scope="session")
+def exports(tmp_path_factory):
+    # small synthetic Garmin exports: English and Portuguese newest first, one oldest first and one in no particular order
+    directory = tmp_path_factory.mktemp("exports")
+    paths = {locale: write_export(str(directory / f"{locale}.csv"), 400, locale, LAST_DAY) for locale in ["en", "pt"]}
+    shuffled = synthetic_export(400, "en", LAST_DAY, seed=1).sample(frac=1, random_state=2)
+    shuffled.to_csv(directory / "shuffled.csv", index=False)
+    paths["shuffled"] = str(directory / "shuffled.csv")
+    synthetic_export(400, "en", LAST_DAY).iloc[::-1].to_csv(directory / "oldest.csv", index=False)
+    paths["oldest"] = str(directory / "oldest.csv")
+    return paths
+
+
+@pytest.fixture(scope="session")
+def en_export(exports) -> str:
+    return exports["en"]
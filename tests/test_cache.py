@@ -0,0 +1,26 @@
+import pandas as pd
+import pytest
+
+from cache import ParsedExportCache
+
+
+def test_missing_entry_is_a_miss(tmp_path):
+    cache = ParsedExportCache(tmp_path)
+    assert cache.get("absent") is None
+    assert cache.stats()["misses"] == 1
+
+
+@pytest.mark.parametrize("damage", ["truncate", "garbage"])
+def test_corrupt_entry_is_evicted_as_a_miss(tmp_path, damage):
+    cache = ParsedExportCache(tmp_path)
+    cache.put("key", pd.DataFrame({"Distance": [1.5, 2.5], "Time": ["00:10:00", "00:12:00"]}))
+    path = tmp_path / "key.feather"
+    content = path.read_bytes()
+    path.write_bytes(content[: len(content) // 2] if damage == "truncate" else b"not a feather file")
+
+    assert cache.get("key") is None
+    assert not path.exists()
+    assert cache.stats()["misses"] == 1
+
+    cache.put("key", pd.DataFrame({"Distance": [3.0]}))
+    assert cache.get("key")["Distance"].tolist() == [3.0]
@@ -0,0 +1,64 @@
+import logging
+
+import pandas as pd
+import pytest
+
+from dataloader import DataLoader
+from engines import compile_report
+from instrumentation import logger
+from synthetic import synthetic_export
+
+
+@pytest.fixture
+def mixed_formats_export(tmp_path):
+    # the date format changes after the rows sampled to pick it
+    export = synthetic_export(300, "en")
+    later = export.index >= 200
+    export.loc[later, "Date"] = pd.to_datetime(export.loc[later, "Date"]).dt.strftime("%d/%m/%Y %H:%M")
+    path = tmp_path / "mixed.csv"
+    export.to_csv(path, index=False)
+    return str(path), export
+
+
+def test_rows_in_another_date_format_are_kept(mixed_formats_export):
+    path, export = mixed_formats_export
+    data = DataLoader(path).load_data()
+    assert len(data) == len(export)
+    assert data["Date"].notna().all()
+    assert data["Date"].iloc[250] == pd.to_datetime(export["Date"].iloc[250], format="%d/%m/%Y %H:%M").normalize()
+
+
+def test_engines_keep_rows_in_another_date_format(mixed_formats_export):
+    path, _ = mixed_formats_export
+    reports = {engine: compile_report(path, engine=engine) for engine in ["pandas", "stdlib"]}
+    assert reports["stdlib"] == reports["pandas"]
+    assert sum(len(runs) for day in reports["pandas"].values() for runs in day.values()) == 300
+
+
+def test_unreadable_start_time_raises(tmp_path):
+    export = synthetic_export(150, "en")
+    export.loc[140, "Date"] = "yesterday morning"
+    path = tmp_path / "broken.csv"
+    export.to_csv(path, index=False)
+    with pytest.raises(ValueError):
+        DataLoader(str(path)).load_data()
+
+
+@pytest.mark.parametrize("name", ["en", "shuffled", "oldest"])
+@pytest.mark.parametrize("start_day", ["2025-03-16", "2025-01-08", "2024-11-20"])
+def test_chunked_load_matches_full_load(exports, name, start_day):
+    full = DataLoader(exports[name], start_day).load_data()
+    full = full.sort_values(["Date", "Time_of_Day"], ignore_index=True)
+    for chunksize in [1, 2, 7, 100, 1000]:
+        chunked = DataLoader(exports[name], start_day, chunksize=chunksize).load_data()
+        pd.testing.assert_frame_equal(chunked.sort_values(["Date", "Time_of_Day"], ignore_index=True), full)
+
+
+def test_memory_footprint_is_only_measured_for_debug_logs(en_export, monkeypatch, caplog):
+    measured = []
+    monkeypatch.setattr(DataLoader, "memory_footprint", lambda self: measured.append(1) or 0)
+    DataLoader(en_export).load_data()
+    assert measured == []
+    with caplog.at_level(logging.DEBUG, logger=logger.name):
+        DataLoader(en_export).load_data()
+    assert measured == [1]
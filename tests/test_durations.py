@@ -0,0 +1,23 @@
+import pandas as pd
+
+from dataloader import DataLoader
+from durations import parse_durations
+
+
+def test_parse_durations_mixes_hours_and_minutes():
+    seconds = parse_durations(pd.Series(["01:16:22", "45:12", "4:53", None]))
+    assert seconds.iloc[:3].tolist() == [4582.0, 2712.0, 293.0]
+    assert pd.isna(seconds.iloc[3])
+
+
+def test_parse_durations_of_nothing_is_empty():
+    for values in [pd.Series([], dtype=object), pd.Series([None, None], dtype=object)]:
+        seconds = parse_durations(values)
+        assert seconds.dtype == float
+        assert seconds.index.equals(values.index)
+        assert seconds.isna().all()
+
+
+def test_compact_loading_of_an_empty_window(en_export):
+    data = DataLoader(en_export, "2020-01-07", 6, compact=True).load_data()
+    assert data.empty
@@ -0,0 +1,59 @@
+import csv
+import io
+import json
+
+import pytest
+
+from dataloader import DataLoader
+from engines import compile_grid
+from formats import ContextRenderer, CsvRenderer, JsonRenderer
+from report import ReportGenerator
+from synthetic import synthetic_export
+
+
+@pytest.fixture
+def tuesday_grid(en_export):
+    # six days before a monday start day: the window runs tuesday to monday
+    return compile_grid(en_export, "2025-03-10", engine="stdlib")
+
+
+def test_json_days_are_named_after_their_dates(tuesday_grid):
+    days = json.loads(JsonRenderer().render_bytes(tuesday_grid))["days"]
+    assert [(day["day"], day["date"]) for day in days[:2]] == [("TUESDAY", "2025-03-04"), ("WEDNESDAY", "2025-03-05")]
+    assert days[-1]["day"] == "MONDAY"
+
+
+def test_csv_days_are_named_after_their_dates(tuesday_grid):
+    rows = list(csv.DictReader(io.StringIO(CsvRenderer().render_bytes(tuesday_grid).decode("utf-8"))))
+    assert (rows[0]["day"], rows[0]["date"]) == ("TUESDAY", "2025-03-04")
+
+
+def test_renderers_must_render():
+    with pytest.raises(TypeError):
+        ContextRenderer()
+
+
+@pytest.fixture
+def speed_export(tmp_path):
+    # a Portuguese export with average speeds instead of paces, missing for the newest run
+    export = synthetic_export(60, "pt")
+    seconds = export.pop("Ritmo médio").str.split(":").map(lambda parts: int(parts[0]) * 60 + int(parts[1]))
+    export["Velocidade média"] = (3600 / seconds).round(1).astype(str).str.replace(".", ",", regex=False)
+    export.loc[0, "Velocidade média"] = "--"
+    path = tmp_path / "speed.csv"
+    export.to_csv(path, index=False)
+    return str(path)
+
+
+@pytest.mark.parametrize("engine", ["pandas", "stdlib", "pyarrow"])
+def test_missing_speed_renders_without_a_pace(speed_export, engine):
+    days = json.loads(JsonRenderer().render_bytes(compile_grid(speed_export, "2025-03-16", engine=engine)))["days"]
+    sunday = days[-1]
+    assert sunday["date"] == "2025-03-16"
+    assert sunday["afternoon"]["pace"] == ""
+    assert sunday["morning"]["pace"]
+
+
+def test_missing_speed_renders_from_a_compact_frame(speed_export):
+    grid = ReportGenerator(DataLoader(speed_export, "2025-03-16", compact=True).load_data()).compile_grid("2025-03-16")
+    assert json.loads(JsonRenderer().render_bytes(grid))["days"][-1]["afternoon"]["pace"] == ""
@@ -0,0 +1,38 @@
+import pytest
+
+from dataloader import DataLoader
+from engines import compile_grid
+from report import ReportGenerator
+
+
+@pytest.mark.parametrize("name", ["en", "pt", "shuffled"])
+def test_vectorized_report_matches_grouped(exports, name):
+    report = ReportGenerator(DataLoader(exports[name]).load_data())
+    assert report.compile_report() == report.compile_report(vectorized=False)
+
+
+def test_vectorized_report_keeps_run_order_within_a_slot(en_export):
+    data = DataLoader(en_export).load_data()
+    report = ReportGenerator(data).compile_report()
+    # the synthetic export splits some half days into a warm up, workout and cool down
+    assert any(len(runs) > 1 for day in report.values() for runs in day.values())
+    assert report == ReportGenerator(data).compile_report(vectorized=False)
+
+
+@pytest.mark.parametrize("name", ["en", "pt", "shuffled"])
+def test_compact_frames_report_like_full_ones(exports, name):
+    compact = ReportGenerator(DataLoader(exports[name], compact=True).load_data()).compile_report()
+    assert compact == ReportGenerator(DataLoader(exports[name]).load_data()).compile_report()
+
+
+@pytest.mark.parametrize("start_day, runs", [("2020-01-01", False), ("2025-03-16", True)])
+def test_engines_agree_on_a_window(en_export, start_day, runs):
+    grids = {engine: compile_grid(en_export, start_day, engine=engine) for engine in ["pandas", "stdlib", "pyarrow"]}
+    for grid in grids.values():
+        assert (grid.first_day, grid.days, grid.cells) == (grids["stdlib"].first_day, grids["stdlib"].days, grids["stdlib"].cells)
+    assert (grids["stdlib"].run_count() > 0) == runs
+
+
+def test_empty_window_is_an_empty_grid(en_export):
+    grid = ReportGenerator(DataLoader(en_export, "2020-01-01").load_data()).compile_grid("2020-01-01")
+    assert (grid.first_day.isoformat(), grid.days, grid.run_count()) == ("2019-12-26", 7, 0)
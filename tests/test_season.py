@@ -0,0 +1,11 @@
+from pathlib import Path
+
+import season
+
+TEMPLATE = str(Path(__file__).resolve().parents[1] / "data" / "log_template.docx")
+
+
+def test_file_name_counts_the_weeks_of_since(en_export, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    season.main([en_export, "--end-day", "2025-03-16", "--since", "2025-02-24", "--template", TEMPLATE, "--no-cache"])
+    assert [path.name for path in tmp_path.iterdir()] == ["Registo_Treino Diogo (3 semanas).docx"]
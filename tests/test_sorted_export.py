@@ -0,0 +1,46 @@
+from datetime import date
+
+import pandas as pd
+import pytest
+
+from dataloader import DataLoader
+from sorted_export import read_window
+from synthetic import synthetic_export
+
+START_DAY = "2025-03-16"
+FIRST_DAY, LAST_DAY = date(2025, 3, 10), date(2025, 3, 16)
+
+
+def write_moved(tmp_path, source: int, target: int) -> str:
+    # a newest-first export with the activity on line source moved to line target
+    export = synthetic_export(2000, "en")
+    order = [i for i in range(len(export)) if i != source]
+    order.insert(target, source)
+    path = tmp_path / "moved.csv"
+    export.iloc[order].to_csv(path, index=False)
+    return str(path)
+
+
+def window_dates(path: str, **kwargs) -> list:
+    return DataLoader(path, START_DAY, **kwargs).load_data()["Date"].tolist()
+
+
+def test_seek_is_opt_in(tmp_path):
+    # an activity of the window moved far down the file, where the sampled order check cannot see it
+    path = write_moved(tmp_path, 0, 1500)
+    full = window_dates(path, seek=False)
+    assert window_dates(path) == full
+    assert pd.Timestamp(LAST_DAY) in full
+
+
+def test_seek_reads_a_sorted_window(en_export):
+    assert read_window(en_export, FIRST_DAY, LAST_DAY) is not None
+    assert window_dates(en_export, seek=True) == window_dates(en_export, seek=False)
+
+
+@pytest.mark.parametrize("source, target", [(1500, 3), (0, 14), (30, 0)])
+def test_seek_falls_back_when_the_window_is_out_of_order(tmp_path, source, target):
+    # into the window, just after it, and just before it
+    path = write_moved(tmp_path, source, target)
+    assert read_window(path, FIRST_DAY, LAST_DAY) is None
+    assert window_dates(path, seek=True) == window_dates(path, seek=False)
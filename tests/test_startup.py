@@ -0,0 +1,24 @@
+import subprocess
+import sys
+
+import bench_startup
+from bench_startup import HEAVY_MODULES, SOURCE_DIR
+
+RUN_STDLIB = (
+    "import sys\n"
+    "from engines import compile_grid, compile_report\n"
+    "report = compile_report(sys.argv[1], '2025-03-16', engine='stdlib')\n"
+    "grid = compile_grid(sys.argv[1], '2025-03-16', engine='stdlib')\n"
+    "assert report and grid.run_count()\n"
+    f"print(','.join(name for name in {HEAVY_MODULES!r} if name in sys.modules))\n"
+)
+
+
+def test_stdlib_path_does_not_import_pandas(en_export):
+    loaded = subprocess.run([sys.executable, "-c", RUN_STDLIB, en_export], cwd=SOURCE_DIR,
+                            capture_output=True, text=True, check=True).stdout.strip()
+    assert loaded == ""
+
+
+def test_startup_within_budget(capsys):
+    assert bench_startup.main(["--repeat", "3"]) == 0, capsys.readouterr().out
@@ -0,0 +1,14 @@
+import pandas as pd
+
+from bench_stages import DEFAULT_SIZES, LAST_DAY
+from dataloader import DataLoader
+from synthetic import HISTORY_DAYS, synthetic_export
+
+
+def test_largest_benchmark_export_parses():
+    rows = max(DEFAULT_SIZES)
+    export = synthetic_export(rows, "en", LAST_DAY)
+    dates = DataLoader("export.csv").parse_dates(export[["Date", "Distance", "Time", "Avg Pace"]].copy())["Date"]
+    assert len(dates) == rows and dates.notna().all()
+    assert dates.min() > pd.Timestamp(LAST_DAY) - pd.Timedelta(days=HISTORY_DAYS)
+    assert dates.is_monotonic_decreasing
@@ -0,0 +1,53 @@
+import gzip
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+import generate
+from tracks import read_tracks, summarize_track
+
+# without an offset, so the times are taken as local and the test does not depend on the time zone
+START = datetime(2025, 3, 12, 7, 0)
+
+
+def write_gpx(path, positions, start=START):
+    points = "".join(
+        f'<trkpt lat="{lat}" lon="{lon}"><time>{(start + timedelta(seconds=10 * i)).isoformat()}</time></trkpt>'
+        for i, (lat, lon) in enumerate(positions)
+    )
+    content = f'<gpx xmlns="http://www.topografix.com/GPX/1/1"><trk><trkseg>{points}</trkseg></trk></gpx>'
+    opener = gzip.open if str(path).endswith(".gz") else open
+    with opener(path, "wt", encoding="utf-8") as f:
+        f.write(content)
+    return str(path)
+
+
+@pytest.fixture
+def tracks_dir(tmp_path):
+    # 50 points 30 m apart (a 5:33 pace) and 50 points standing still
+    write_gpx(tmp_path / "run.gpx.gz", [(38.7 + 0.00027 * i, -9.14) for i in range(50)])
+    write_gpx(tmp_path / "still.gpx", [(38.7, -9.14)] * 50, START + timedelta(hours=10))
+    return tmp_path
+
+
+def test_summarize_track(tracks_dir):
+    [row] = summarize_track(str(tracks_dir / "run.gpx.gz"))
+    assert row["Distance"] == 1.47
+    assert row["Time"] == "00:08:10"
+    assert row["Avg Pace"] == "5:33"
+
+
+def test_stationary_track_has_an_empty_pace(tracks_dir):
+    [row] = summarize_track(str(tracks_dir / "still.gpx"))
+    assert (row["Distance"], row["Time"], row["Avg Pace"]) == (0.0, "00:00:00", "")
+    assert len(read_tracks(str(tracks_dir), workers=1)) == 2
+
+
+def test_tracks_folder_renders(tracks_dir, tmp_path):
+    output = tmp_path / "log.json"
+    assert generate.main([str(tracks_dir), "--start-day", "2025-03-16", "--format", "json", "--output", str(output)]) == 0
+    days = json.loads(output.read_text(encoding="utf-8"))["days"]
+    wednesday = next(day for day in days if day["date"] == "2025-03-12")
+    assert wednesday["morning"]["pace"] == "5:33"
+    assert [day[period]["pace"] for day in days for period in ["morning", "afternoon"] if day[period]["distance"]].count("") == 1
@@ -0,0 +1,49 @@
+import os
+from datetime import date
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+import watch
+from synthetic import synthetic_export
+
+TEMPLATE = str(Path(__file__).resolve().parents[1] / "data" / "log_template.docx")
+LAST_WEEK = date(2025, 3, 10)
+
+
+@pytest.fixture
+def service(tmp_path):
+    (tmp_path / "exports").mkdir()
+    return watch.WatchService(str(tmp_path / "exports"), str(tmp_path / "logs"), TEMPLATE, use_cache=False)
+
+
+def documents(service):
+    return sorted(os.listdir(os.path.join(service.output_dir, "Diogo")))
+
+
+def test_weeks_emptied_from_the_export_lose_their_log(service):
+    export = synthetic_export(60, "en")
+    path = os.path.join(service.directory, "Diogo.csv")
+    os.makedirs(service.output_dir)
+    export.to_csv(path, index=False)
+    service.process(path)
+    assert "Registo_Treino Diogo 2025-W11.docx" in documents(service)
+
+    export[pd.to_datetime(export["Date"]) < pd.Timestamp(LAST_WEEK)].to_csv(path, index=False)
+    assert service.process(path) == [LAST_WEEK]
+    assert "Registo_Treino Diogo 2025-W11.docx" not in documents(service)
+    assert LAST_WEEK.isoformat() not in service.state["Diogo"]
+
+
+def test_unchanged_exports_are_not_parsed_again(service, monkeypatch):
+    path = os.path.join(service.directory, "Diogo.csv")
+    os.makedirs(service.output_dir)
+    synthetic_export(60, "en").to_csv(path, index=False)
+    loads = []
+    loader = watch.DataLoader
+    monkeypatch.setattr(watch, "DataLoader", lambda *args, **kwargs: loads.append(args) or loader(*args, **kwargs))
+
+    service.process(path)
+    assert service.process(path) == []
+    assert len(loads) == 1